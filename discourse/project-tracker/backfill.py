@@ -14,19 +14,43 @@ Usage:
 
     # Save draft to file for review
     python backfill.py > draft.md
+
+    # Continue an interrupted run from its checkpoint journal
+    python backfill.py --resume
+
+    # Nightly reconciliation — extract posts since the last run and merge
+    # them into the live wiki post
+    python backfill.py --incremental
+
+    # Full crawl, merged into the live wiki post; prints a row-level diff
+    python backfill.py --apply
+
+    # Print the row-level diff of --apply or --incremental without writing
+    python backfill.py --apply --dry-run
 """
 
 import argparse
+import itertools
 import json
 import logging
 import os
 import re
 import sys
-import time
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator
 
 import anthropic
-import requests
+
+from checkpoint import CheckpointJournal, CheckpointState
+from discourse_client import DiscourseClient, parse_retry_after
+from extraction_cache import ExtractionCache
+from llm_usage import UsageTracker
+from post_text import post_text
+from ratelimit import AdaptiveRateLimiter
+from spool import MemberSpool, SpoolChunk
+import wiki
 
 # Reuse config from tracker
 DISCOURSE_URL = os.environ.get("DISCOURSE_URL", "https://community.adventuresinclaude.ai")
@@ -35,6 +59,45 @@ DISCOURSE_API_USERNAME = os.environ.get("DISCOURSE_API_USERNAME", "bfeld")
 ANTHROPIC_API_KEY = os.environ["ANTHROPIC_API_KEY"]
 CONFIDENCE_THRESHOLD = 0.7
 PROJECTS_CATEGORY_ID = 6  # Projects category
+EXTRACTION_MODEL = "claude-haiku-4-5-20251001"
+DISCOURSE_POOL_SIZE = int(os.environ.get("DISCOURSE_POOL_SIZE", "4"))
+DISCOURSE_MAX_RETRIES = int(os.environ.get("DISCOURSE_MAX_RETRIES", "4"))
+
+# Crawl concurrency and adaptive Discourse rate limit (requests/second)
+BACKFILL_CONCURRENCY = int(os.environ.get("BACKFILL_CONCURRENCY", "4"))
+DISCOURSE_RATE = float(os.environ.get("DISCOURSE_RATE", "1.0"))
+DISCOURSE_MIN_RATE = float(os.environ.get("DISCOURSE_MIN_RATE", "0.1"))
+DISCOURSE_MAX_RATE = float(os.environ.get("DISCOURSE_MAX_RATE", "10.0"))
+CATEGORY_IDS = [5, 6, 7, 8]  # Introductions, Projects, Tips, Discussion
+
+# Extraction: posts per Claude call are capped by an input token budget, and
+# calls across all members run concurrently under an adaptive rate limit
+EXTRACTION_CHUNK_TOKENS = int(os.environ.get("EXTRACTION_CHUNK_TOKENS", "6000"))
+EXTRACTION_CONCURRENCY = int(os.environ.get("EXTRACTION_CONCURRENCY", "4"))
+CLAUDE_RATE = float(os.environ.get("CLAUDE_RATE", "1.0"))
+CLAUDE_MIN_RATE = float(os.environ.get("CLAUDE_MIN_RATE", "0.1"))
+CLAUDE_MAX_RATE = float(os.environ.get("CLAUDE_MAX_RATE", "5.0"))
+POST_CHAR_LIMIT = 2000  # Longer posts are truncated in the prompt
+
+# Wiki post written by --incremental (same values as tracker.py)
+WIKI_POST_ID = int(os.environ.get("WIKI_POST_ID", "0"))
+WIKI_TOPIC_ID = int(os.environ.get("WIKI_TOPIC_ID", "0"))
+WIKI_CONFLICT_RETRIES = 3
+
+# High-water mark for --incremental, and how far back to look for edited posts
+BACKFILL_CURSOR_PATH = os.environ.get("BACKFILL_CURSOR_PATH", "backfill-cursor.json")
+BACKFILL_EDIT_LOOKBACK_DAYS = float(os.environ.get("BACKFILL_EDIT_LOOKBACK_DAYS", "7"))
+
+# Journal of completed work, replayed by --resume
+BACKFILL_CHECKPOINT_PATH = os.environ.get("BACKFILL_CHECKPOINT_PATH", "backfill-checkpoint.jsonl")
+# Scratch directory holding crawled posts per member until they are extracted
+BACKFILL_SPOOL_DIR = os.environ.get("BACKFILL_SPOOL_DIR", "backfill-spool")
+
+# Same cache file as tracker.py, so re-runs skip members whose posts haven't changed
+EXTRACTION_CACHE_PATH = os.environ.get("EXTRACTION_CACHE_PATH", "extraction-cache.sqlite3")
+EXTRACTION_CACHE_TTL_DAYS = float(os.environ.get("EXTRACTION_CACHE_TTL_DAYS", "90"))
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.environ.get("EXTRACTION_CACHE_MAX_ENTRIES", "50000"))
+LLM_STATS_PATH = os.environ.get("LLM_STATS_PATH", "llm-stats.json")
 
 logging.basicConfig(
     level=logging.INFO,
@@ -43,13 +106,22 @@ logging.basicConfig(
 )
 log = logging.getLogger("backfill")
 
-DISCOURSE_HEADERS = {
-    "Api-Key": DISCOURSE_API_KEY,
-    "Api-Username": DISCOURSE_API_USERNAME,
-    "Content-Type": "application/json",
-}
-
+discourse = DiscourseClient(
+    DISCOURSE_URL,
+    DISCOURSE_API_KEY,
+    DISCOURSE_API_USERNAME,
+    pool_size=max(DISCOURSE_POOL_SIZE, BACKFILL_CONCURRENCY),
+    max_retries=DISCOURSE_MAX_RETRIES,
+    rate_limiter=AdaptiveRateLimiter(DISCOURSE_RATE, DISCOURSE_MIN_RATE, DISCOURSE_MAX_RATE),
+)
 client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+claude_limiter = AdaptiveRateLimiter(CLAUDE_RATE, CLAUDE_MIN_RATE, CLAUDE_MAX_RATE)
+extraction_cache = ExtractionCache(
+    EXTRACTION_CACHE_PATH,
+    ttl_seconds=EXTRACTION_CACHE_TTL_DAYS * 86400,
+    max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+)
+usage_tracker = UsageTracker(LLM_STATS_PATH)
 
 
 def sanitize_field(s: str) -> str:
@@ -62,54 +134,73 @@ def sanitize_field(s: str) -> str:
 # ---------------------------------------------------------------------------
 
 
-def fetch_all_topics() -> list[dict]:
-    """Fetch all topics across all categories."""
+def fetch_category_topics(category_id: int) -> list[dict] | None:
+    """Fetch every page of one category's topic list. Returns None if any page failed."""
     topics = []
-    # Fetch from each category's topic list
-    for category_id in [5, 6, 7, 8]:  # Introductions, Projects, Tips, Discussion
-        page = 0
-        while True:
-            url = f"{DISCOURSE_URL}/c/{category_id}.json?page={page}"
-            resp = requests.get(url, headers=DISCOURSE_HEADERS, timeout=30)
-            if resp.status_code != 200:
-                break
-            data = resp.json()
-            topic_list = data.get("topic_list", {}).get("topics", [])
-            if not topic_list:
-                break
-            topics.extend(topic_list)
-            page += 1
-            time.sleep(0.5)  # Rate limit courtesy
+    page = 0
+    while True:
+        resp = discourse.request("GET", f"/c/{category_id}.json?page={page}", raise_for_status=False)
+        if resp.status_code != 200:
+            # Not the end of the list: stopping here would silently drop the remaining topics
+            log.warning("Failed to fetch page %d of category %d: %d", page, category_id, resp.status_code)
+            return None
+        data = resp.json()
+        topic_list = data.get("topic_list", {}).get("topics", [])
+        if not topic_list:
+            break
+        topics.extend(topic_list)
+        page += 1
+    return topics
+
 
+def fetch_all_topics() -> list[dict] | None:
+    """Fetch all topics across all categories (categories in parallel). None if any category failed."""
+    topics = []
+    failed = []
+    # Pacing comes from the shared rate limiter, not fixed sleeps
+    with ThreadPoolExecutor(max_workers=BACKFILL_CONCURRENCY) as pool:
+        results = pool.map(fetch_category_topics, CATEGORY_IDS)
+        for category_id, category_topics in zip(CATEGORY_IDS, results):
+            if category_topics is None:
+                failed.append(category_id)
+            else:
+                topics.extend(category_topics)
+
+    if failed:
+        log.error("Could not list the topics of category %s", ", ".join(str(c) for c in failed))
+        return None
     log.info("Fetched %d topics across all categories", len(topics))
     return topics
 
 
-def fetch_topic_posts(topic_id: int) -> list[dict]:
-    """Fetch all posts in a topic."""
+def post_record(post: dict, topic_id: int, topic_title: str) -> dict:
+    """The fields backfill keeps from a Discourse post."""
+    return {
+        "id": post["id"],
+        "username": post.get("username", ""),
+        "content": post_text(post),
+        "topic_id": topic_id,
+        "topic_title": topic_title,
+        "post_number": post.get("post_number", 1),
+        "created_at": post.get("created_at", ""),
+    }
+
+
+def fetch_topic_posts(topic_id: int) -> list[dict] | None:
+    """Fetch all posts in a topic. Returns None if any request for it failed."""
     posts = []
-    url = f"{DISCOURSE_URL}/t/{topic_id}.json"
-    resp = requests.get(url, headers=DISCOURSE_HEADERS, timeout=30)
+    # include_raw asks for markdown alongside cooked; post_text falls back to cooked without it
+    resp = discourse.request("GET", f"/t/{topic_id}.json?include_raw=true", raise_for_status=False)
     if resp.status_code != 200:
         log.warning("Failed to fetch topic %d: %d", topic_id, resp.status_code)
-        return []
+        return None
 
     data = resp.json()
     post_stream = data.get("post_stream", {})
     posts_data = post_stream.get("posts", [])
 
     for post in posts_data:
-        # Topic endpoint returns cooked (HTML) but not raw; use cooked
-        content = post.get("raw", "") or post.get("cooked", "")
-        posts.append({
-            "id": post["id"],
-            "username": post.get("username", ""),
-            "content": content,
-            "topic_id": topic_id,
-            "topic_title": data.get("title", ""),
-            "post_number": post.get("post_number", 1),
-            "created_at": post.get("created_at", ""),
-        })
+        posts.append(post_record(post, topic_id, data.get("title", "")))
 
     # If there are more posts not included in the initial response
     stream_ids = post_stream.get("stream", [])
@@ -120,29 +211,166 @@ def fetch_topic_posts(topic_id: int) -> list[dict]:
         # Fetch in chunks of 20
         for i in range(0, len(missing_ids), 20):
             chunk = missing_ids[i:i + 20]
-            params = "&".join(f"post_ids[]={pid}" for pid in chunk)
-            extra_url = f"{DISCOURSE_URL}/t/{topic_id}/posts.json?{params}"
-            extra_resp = requests.get(extra_url, headers=DISCOURSE_HEADERS, timeout=30)
+            params = "&".join(f"post_ids[]={pid}" for pid in chunk) + "&include_raw=true"
+            extra_resp = discourse.request(
+                "GET", f"/t/{topic_id}/posts.json?{params}", raise_for_status=False
+            )
             if extra_resp.status_code == 200:
                 extra_posts = extra_resp.json().get("post_stream", {}).get("posts", [])
                 for post in extra_posts:
-                    content = post.get("raw", "") or post.get("cooked", "")
-                    posts.append({
-                        "id": post["id"],
-                        "username": post.get("username", ""),
-                        "content": content,
-                        "topic_id": topic_id,
-                        "topic_title": data.get("title", ""),
-                        "post_number": post.get("post_number", 1),
-                        "created_at": post.get("created_at", ""),
-                    })
-            time.sleep(0.3)
+                    posts.append(post_record(post, topic_id, data.get("title", "")))
+            else:
+                log.warning("Failed to fetch posts for topic %d: %d", topic_id, extra_resp.status_code)
+                return None
 
     return posts
 
 
+def fetch_topics_posts(topic_ids: Iterable[int]) -> Iterator[tuple[int, list[dict] | None]]:
+    """Fetch topics BACKFILL_CONCURRENCY at a time, yielding (topic_id, posts) as each completes.
+
+    Only a couple of topics per worker are in flight, so fetched posts never
+    pile up faster than the consumer takes them.
+    """
+    ids = iter(topic_ids)
+    with ThreadPoolExecutor(max_workers=BACKFILL_CONCURRENCY) as pool:
+        pending = {pool.submit(fetch_topic_posts, tid): tid
+                   for tid in itertools.islice(ids, 2 * BACKFILL_CONCURRENCY)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                topic_id = pending.pop(future)
+                next_id = next(ids, None)
+                if next_id is not None:
+                    pending[pool.submit(fetch_topic_posts, next_id)] = next_id
+                yield topic_id, future.result()
+
+
+class CrawlProgress:
+    """Running totals of a streamed crawl."""
+
+    def __init__(self):
+        self.posts = 0
+        self.newest_post_id = 0
+        self.failed_topics: list[int] = []
+
+    def add(self, posts: list[dict]) -> None:
+        self.posts += len(posts)
+        self.newest_post_id = max([self.newest_post_id] + [p["id"] for p in posts])
+
+
+def crawl_posts(
+    topic_ids: list[int],
+    checkpoint: CheckpointState,
+    journal: CheckpointJournal,
+    progress: CrawlProgress,
+) -> Iterator[list[dict]]:
+    """Yield each topic's posts still needing extraction, journaled topics first.
+
+    Posts by members whose extraction is already checkpointed are left out.
+    """
+    if checkpoint.fetched_topics:
+        log.info("Replaying %d fetched topics from the checkpoint...", len(checkpoint.fetched_topics))
+        for _, posts in journal.replay_topics():
+            progress.add(posts)
+            yield [p for p in posts if p["username"] not in checkpoint.members]
+
+    remaining = [tid for tid in topic_ids if tid not in checkpoint.fetched_topics]
+    log.info("Fetching posts from %d topics (%d already fetched)...",
+             len(remaining), len(topic_ids) - len(remaining))
+    for done, (topic_id, posts) in enumerate(fetch_topics_posts(remaining), 1):
+        if done % 50 == 0:
+            log.info("  %d/%d topics fetched (%.2f req/s)",
+                     done, len(remaining), discourse.rate_limiter.rate)
+        if posts is None:
+            # Not journaled, so --resume retries this topic
+            progress.failed_topics.append(topic_id)
+            continue
+        # Filter out system posts, and posts that were nothing but quotes or images
+        posts = [p for p in posts
+                 if p["content"] and p["username"] not in ("system", DISCOURSE_API_USERNAME)]
+        journal.record_topic(topic_id, posts)
+        progress.add(posts)
+        yield [p for p in posts if p["username"] not in checkpoint.members]
+
+
+# ---------------------------------------------------------------------------
+# Incremental crawl — only posts created or edited since the last run
+# ---------------------------------------------------------------------------
+
+
+def parse_timestamp(value: str | None) -> datetime | None:
+    """Parse a Discourse ISO-8601 timestamp ("2025-01-02T03:04:05.678Z")."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def load_cursor() -> dict | None:
+    """The {last_post_id, last_run_at} high-water mark of the last run, if any."""
+    try:
+        with open(BACKFILL_CURSOR_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_cursor(last_post_id: int, run_started: datetime) -> None:
+    tmp_path = f"{BACKFILL_CURSOR_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_post_id": last_post_id, "last_run_at": run_started.isoformat()}, f)
+    os.replace(tmp_path, BACKFILL_CURSOR_PATH)
+    log.info("Cursor advanced to post %d", last_post_id)
+
+
+def fetch_posts_since(cursor: dict) -> tuple[list[dict], int]:
+    """Page back through the latest-posts listing to everything new or edited since the cursor.
+
+    A post is picked up if its id is above the cursor's last_post_id, or it
+    was updated after last_run_at. Edits are only found for posts created
+    within BACKFILL_EDIT_LOOKBACK_DAYS of the last run, since that is where
+    paging stops. Returns (posts, highest post id seen).
+    """
+    last_post_id = cursor.get("last_post_id")
+    last_run_at = parse_timestamp(cursor["last_run_at"])
+    cutoff = last_run_at - timedelta(days=BACKFILL_EDIT_LOOKBACK_DAYS)
+
+    posts = []
+    newest_id = last_post_id or 0
+    before = None
+    while True:
+        # Newest first; ?before=ID continues below the oldest post of the previous page
+        path = f"/posts.json?before={before}" if before else "/posts.json"
+        page = discourse.get(path).get("latest_posts", [])
+        if not page:
+            break
+
+        for post in page:
+            newest_id = max(newest_id, post["id"])
+            if post.get("category_id") not in CATEGORY_IDS or post.get("topic_id") == WIKI_TOPIC_ID:
+                continue
+            if post.get("username") in ("system", DISCOURSE_API_USERNAME):
+                continue
+            updated_at = parse_timestamp(post.get("updated_at") or post.get("created_at"))
+            is_new = last_post_id is not None and post["id"] > last_post_id
+            is_edited = updated_at is not None and updated_at > last_run_at
+            record = post_record(post, post["topic_id"], post.get("topic_title", ""))
+            if (is_new or is_edited) and record["content"]:
+                posts.append(record)
+
+        oldest_created = parse_timestamp(page[-1].get("created_at"))
+        if oldest_created is None or oldest_created < cutoff:
+            break
+        before = min(post["id"] for post in page)
+
+    return posts, newest_id
+
+
 # ---------------------------------------------------------------------------
-# Claude extraction (batch by member)
+# Claude extraction (batch by member, chunked by token budget)
 # ---------------------------------------------------------------------------
 
 BATCH_EXTRACTION_PROMPT = """\
@@ -187,31 +415,180 @@ Only include projects with confidence >= 0.7.
 """
 
 
-def extract_projects_batch(member: str, posts: list[dict]) -> list[dict]:
-    """Extract projects from all posts by a single member."""
-    # Build context with numbered posts
-    post_texts = []
-    for i, post in enumerate(posts):
-        topic_info = f" (topic: {post['topic_title']})" if post.get("topic_title") else ""
-        post_texts.append(f"--- Post {i}{topic_info} ---\n{post['content'][:2000]}")
-
-    combined = "\n\n".join(post_texts)
-
-    message = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=2048,
-        messages=[
-            {
-                "role": "user",
-                "content": (
-                    f"All posts by @{member} ({len(posts)} total):\n\n"
-                    f"{combined}\n\n"
-                    "Extract all project mentions from these posts."
-                ),
-            }
-        ],
-        system=BATCH_EXTRACTION_PROMPT,
-    )
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def format_post(index: int, post: dict) -> str:
+    topic_info = f" (topic: {post['topic_title']})" if post.get("topic_title") else ""
+    return f"--- Post {index}{topic_info} ---\n{post['content'][:POST_CHAR_LIMIT]}"
+
+
+def post_tokens(post: dict) -> int:
+    return estimate_tokens(format_post(0, post))
+
+
+def extract_posts(post_batches: Iterable[list[dict]]) -> Iterator[tuple[str, list[dict] | None]]:
+    """Extract projects from a stream of posts, overlapping extraction with the stream.
+
+    Posts are spooled to disk per member. Whenever a member's spooled posts
+    reach EXTRACTION_CHUNK_TOKENS, that chunk is queued for Claude right away,
+    with EXTRACTION_CONCURRENCY calls running across all members. Once the
+    stream ends and every chunk is done, yields (member, projects) per member.
+    Projects is None if a Claude call for the member failed, so it can be retried.
+    """
+    spool = MemberSpool(BACKFILL_SPOOL_DIR, EXTRACTION_CHUNK_TOKENS, post_tokens)
+    chunk_results: dict[str, dict[int, list[dict]]] = defaultdict(dict)
+    chunk_counts: dict[str, int] = defaultdict(int)
+    failed: set[str] = set()
+    futures = {}
+
+    try:
+        with ThreadPoolExecutor(max_workers=EXTRACTION_CONCURRENCY) as pool:
+            def submit(chunk: SpoolChunk) -> None:
+                # Queued work is just a byte range; the worker reads the posts back
+                futures[pool.submit(extract_spooled, spool, chunk)] = (
+                    chunk.member, chunk_counts[chunk.member])
+                chunk_counts[chunk.member] += 1
+
+            for posts in post_batches:
+                for post in posts:
+                    chunk = spool.add(post["username"], post)
+                    if chunk:
+                        submit(chunk)
+            for chunk in spool.flush():
+                submit(chunk)
+
+            log.info("Spooled %d posts from %d members into %d chunk(s); %d already extracted",
+                     spool.post_count, spool.member_count, len(futures),
+                     sum(f.done() for f in futures))
+
+            remaining = dict(chunk_counts)
+            for future in as_completed(futures):
+                member, i = futures[future]
+                try:
+                    chunk_results[member][i] = future.result()
+                except Exception:
+                    log.exception("Extraction failed for @%s (chunk %d)", member, i + 1)
+                    failed.add(member)
+                remaining[member] -= 1
+                if remaining[member]:
+                    continue
+                if member in failed:
+                    yield member, None
+                else:
+                    results = chunk_results.pop(member)
+                    yield member, wiki.reduce_member_projects([results[i] for i in sorted(results)])
+    finally:
+        spool.close()
+
+
+def extract_spooled(spool: MemberSpool, chunk: SpoolChunk) -> list[dict]:
+    posts = spool.read(chunk)
+    log.info("Extracting projects for @%s (%d posts)...", chunk.member, len(posts))
+    return extract_chunk(chunk.member, posts)
+
+
+def post_cache_key(member: str, post: dict) -> str:
+    """Cache key for one post as it appears in a batch prompt."""
+    return ExtractionCache.key(format_post(0, post), member, BATCH_EXTRACTION_PROMPT, EXTRACTION_MODEL)
+
+
+def extract_chunk(member: str, posts: list[dict]) -> list[dict]:
+    """Extract projects from one chunk of a member's posts.
+
+    Results are cached per post, so only posts without a cached extraction
+    are sent to Claude, however the posts were chunked on earlier runs.
+    """
+    per_post = [extraction_cache.get(post_cache_key(member, post)) for post in posts]
+    missed = [i for i, projects in enumerate(per_post) if projects is None]
+    if len(missed) < len(posts):
+        log.info("  Extraction cache hit for @%s (%d of %d posts)", member,
+                 len(posts) - len(missed), len(posts))
+    if missed:
+        fresh = extract_uncached(member, [posts[i] for i in missed])
+        for i, projects in zip(missed, fresh):
+            per_post[i] = projects
+
+    extracted = []
+    for post, projects in zip(posts, per_post):
+        post_url = f"{DISCOURSE_URL}/t/{post['topic_id']}/{post['post_number']}"
+        for p in projects:
+            if p.get("confidence", 0) < CONFIDENCE_THRESHOLD:
+                continue
+
+            proj_url = p.get("url") or ""
+            if proj_url == "null":
+                proj_url = ""
+
+            extracted.append({
+                "name": sanitize_field(p["name"]),
+                "url": proj_url,
+                "member": f"@{member}",
+                "description": sanitize_field(p["description"]),
+                "tier": p["tier"],
+                "confidence": p.get("confidence", 0.7),
+                "links": f"[Post]({post_url})",
+                "post_urls": [post_url],
+            })
+
+    # One entry per project, even when several posts mention it
+    return wiki.reduce_member_projects([extracted])
+
+
+def extract_uncached(member: str, posts: list[dict]) -> list[list[dict]]:
+    """Ask Claude about posts missing from the cache. Returns each post's projects."""
+    combined = "\n\n".join(format_post(i, post) for i, post in enumerate(posts))
+    projects = call_batch_extraction(member, combined, len(posts))
+    if projects is None:
+        if len(posts) == 1:
+            return [[]]
+        # Usually a reply cut off at max_tokens; halves have fewer projects to list
+        log.info("  Splitting %d-post chunk for @%s and retrying", len(posts), member)
+        half = len(posts) // 2
+        return extract_uncached(member, posts[:half]) + extract_uncached(member, posts[half:])
+
+    # Fan results back out to the post(s) each project came from
+    per_post: list[list[dict]] = [[] for _ in posts]
+    for p in projects:
+        source_posts = {
+            idx for idx in p.get("source_posts", [0])
+            if isinstance(idx, int) and 0 <= idx < len(posts)
+        }
+        project = {k: v for k, v in p.items() if k != "source_posts"}
+        for idx in sorted(source_posts):
+            per_post[idx].append(project)
+    for post, post_projects in zip(posts, per_post):
+        extraction_cache.put(post_cache_key(member, post), post_projects)
+    return per_post
+
+
+def call_batch_extraction(member: str, combined: str, post_count: int) -> list[dict] | None:
+    """Ask Claude for the projects in a member's combined posts. None if the reply isn't JSON."""
+    claude_limiter.acquire()
+    try:
+        message = usage_tracker.create(
+            client,
+            "batch",
+            model=EXTRACTION_MODEL,
+            max_tokens=2048,
+            messages=[
+                {
+                    "role": "user",
+                    "content": (
+                        f"Posts by @{member} ({post_count} total):\n\n"
+                        f"{combined}\n\n"
+                        "Extract all project mentions from these posts."
+                    ),
+                }
+            ],
+            system=BATCH_EXTRACTION_PROMPT,
+        )
+    except anthropic.RateLimitError as e:
+        claude_limiter.on_throttle(parse_retry_after(e.response.headers.get("retry-after")))
+        raise
+    claude_limiter.on_success()
 
     text = message.content[0].text
     json_match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
@@ -222,38 +599,9 @@ def extract_projects_batch(member: str, posts: list[dict]) -> list[dict]:
         result = json.loads(text)
     except json.JSONDecodeError:
         log.warning("Failed to parse Claude response for @%s: %s", member, text[:200])
-        return []
-
-    projects = result.get("projects", [])
-    extracted = []
-    for p in projects:
-        if p.get("confidence", 0) < CONFIDENCE_THRESHOLD:
-            continue
-
-        # Resolve source post links
-        source_indices = p.get("source_posts", [0])
-        links = []
-        for idx in source_indices:
-            if 0 <= idx < len(posts):
-                post = posts[idx]
-                url = f"{DISCOURSE_URL}/t/{post['topic_id']}/{post['post_number']}"
-                links.append(f"[Post]({url})")
-
-        proj_url = p.get("url") or ""
-        if proj_url == "null":
-            proj_url = ""
+        return None
 
-        extracted.append({
-            "name": sanitize_field(p["name"]),
-            "url": proj_url,
-            "member": f"@{member}",
-            "description": sanitize_field(p["description"]),
-            "tier": p["tier"],
-            "confidence": p.get("confidence", 0.7),
-            "links": ", ".join(links) if links else "",
-        })
-
-    return extracted
+    return result.get("projects", [])
 
 
 # ---------------------------------------------------------------------------
@@ -263,55 +611,7 @@ def extract_projects_batch(member: str, posts: list[dict]) -> list[dict]:
 
 def render_wiki_post(all_projects: list[dict]) -> str:
     """Render the full wiki post from all extracted projects."""
-    from datetime import datetime, timezone
-
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-
-    tiers = {
-        "products_and_tools": [],
-        "active_experiments": [],
-        "explorations": [],
-    }
-
-    for proj in all_projects:
-        tiers.setdefault(proj["tier"], []).append(proj)
-
-    # Sort each tier by project name
-    for tier in tiers.values():
-        tier.sort(key=lambda p: p["name"].lower())
-
-    sections = []
-    sections.append("# Community Project Directory\n")
-    sections.append(
-        "A living list of what AIC members are building. This post is a wiki — "
-        "edit it directly to add or update your projects. The list is also "
-        "updated automatically when you mention projects in your posts.\n"
-    )
-
-    tier_config = [
-        ("products_and_tools", "Products & Tools", "Projects that are shipped, named, and available for use."),
-        ("active_experiments", "Active Experiments", "Things actively being built or prototyped."),
-        ("explorations", "Explorations", "Early-stage ideas and one-off experiments."),
-    ]
-
-    for tier_key, tier_title, tier_desc in tier_config:
-        sections.append(f"## {tier_title}")
-        sections.append(f"{tier_desc}\n")
-        sections.append("| Project | Member | Description | Links |")
-        sections.append("|---------|--------|-------------|-------|")
-        for entry in tiers.get(tier_key, []):
-            proj_url = entry.get("url", "")
-            proj_cell = f"[{entry['name']}]({proj_url})" if proj_url else entry["name"]
-            sections.append(
-                f"| {proj_cell} | {entry['member']} | "
-                f"{entry['description']} | {entry['links']} |"
-            )
-        sections.append("")
-
-    sections.append("---")
-    sections.append(f"*Last automated update: {now}*")
-
-    return "\n".join(sections)
+    return wiki.render_wiki_post(wiki.tiers_from_projects(all_projects))
 
 
 # ---------------------------------------------------------------------------
@@ -322,47 +622,150 @@ def render_wiki_post(all_projects: list[dict]) -> str:
 def create_wiki_topic(content: str) -> dict:
     """Create the pinned wiki topic in the Projects category."""
     # Create the topic
-    result = requests.post(
-        f"{DISCOURSE_URL}/posts.json",
-        headers=DISCOURSE_HEADERS,
-        json={
-            "title": "Community Project Directory",
-            "raw": content,
-            "category": PROJECTS_CATEGORY_ID,
-        },
-        timeout=30,
-    )
-    result.raise_for_status()
-    post_data = result.json()
+    post_data = discourse.post("/posts.json", {
+        "title": "Community Project Directory",
+        "raw": content,
+        "category": PROJECTS_CATEGORY_ID,
+    })
 
     topic_id = post_data["topic_id"]
     post_id = post_data["id"]
 
     # Make it a wiki post
-    requests.put(
-        f"{DISCOURSE_URL}/posts/{post_id}/wiki",
-        headers=DISCOURSE_HEADERS,
-        json={"wiki": True},
-        timeout=30,
-    ).raise_for_status()
+    discourse.put(f"/posts/{post_id}/wiki", {"wiki": True})
 
     # Pin the topic
-    requests.put(
-        f"{DISCOURSE_URL}/t/{topic_id}/status",
-        headers=DISCOURSE_HEADERS,
-        json={"status": "pinned", "enabled": True},
-        timeout=30,
-    ).raise_for_status()
+    discourse.put(f"/t/{topic_id}/status", {"status": "pinned", "enabled": True})
 
     log.info("Created wiki topic %d with post %d", topic_id, post_id)
     return {"topic_id": topic_id, "post_id": post_id}
 
 
+# ---------------------------------------------------------------------------
+# Merging into the live wiki post
+# ---------------------------------------------------------------------------
+
+
+def merge_into_wiki(
+    projects: list[dict],
+    report: Callable[[list[wiki.RowChange]], None],
+    dry_run: bool = False,
+) -> list[wiki.RowChange]:
+    """Merge extracted projects into the wiki post with the tracker's merge rules.
+
+    Existing rows keep their tier and gain any new post links, a longer
+    description or a missing URL; unknown projects are appended. The wiki
+    is only written if some row changed. The PUT carries the text we merged
+    against, so a concurrent edit by a member or by tracker.py gets a 409
+    and we re-fetch and re-merge.
+
+    The row changes are passed to ``report`` before the wiki is written
+    (again after a re-merge); with ``dry_run`` nothing is written.
+    Returns the row changes.
+    """
+    for _ in range(WIKI_CONFLICT_RETRIES):
+        post_data = discourse.get(f"/posts/{WIKI_POST_ID}.json")
+        raw = post_data.get("raw", "")
+        tiers = wiki.parse_wiki_tables(raw)
+        original = {tier: [dict(entry) for entry in entries] for tier, entries in tiers.items()}
+
+        index = wiki.build_project_index(tiers)
+        added = []
+        for proj in projects:
+            # One merge per source post, so every post link lands on the row
+            for post_url in proj.get("post_urls") or [""]:
+                tiers, proj_added = wiki.merge_projects(tiers, [proj], post_url, index)
+                added.extend(proj_added)
+
+        changes = wiki.diff_tiers(original, tiers)
+        if not changes:
+            log.info("Wiki post already up to date")
+            return []
+        report(changes)
+        if dry_run:
+            log.info("Dry run: not writing %d changed row(s)", len(changes))
+            return changes
+
+        resp = discourse.request("PUT", f"/posts/{WIKI_POST_ID}.json", json={
+            "post": {"raw": wiki.render_wiki_post(tiers), "raw_old": raw},
+        }, raise_for_status=False)
+        if resp.status_code == 409:
+            log.info("Wiki post changed since version %s — re-fetching and re-merging; "
+                     "the diff that follows replaces the one above", post_data.get("version"))
+            continue
+        resp.raise_for_status()
+        log.info("Updated wiki post to version %s: %d new project(s), %d row(s) changed",
+                 resp.json().get("post", {}).get("version"), len(added), len(changes))
+        return changes
+
+    raise RuntimeError(f"Wiki post kept changing after {WIKI_CONFLICT_RETRIES} merge attempts")
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
 
+def log_run_stats() -> None:
+    log.info("Extraction cache: %s", extraction_cache.stats())
+    log.info("Discourse calls: %s", discourse.timings())
+    usage_tracker.log_summary()
+    usage_tracker.write_stats()
+
+
+def log_row_changes(changes: list[wiki.RowChange]) -> None:
+    for change in changes:
+        log.info("  %s", wiki.format_row_change(change))
+
+
+def print_row_changes(changes: list[wiki.RowChange]) -> None:
+    for change in changes:
+        print(wiki.format_row_change(change))
+    sys.stdout.flush()
+
+
+def run_incremental(dry_run: bool = False) -> None:
+    """Extract only posts created or edited since the cursor and merge them into the wiki."""
+    run_started = datetime.now(timezone.utc)
+    cursor = load_cursor()
+    if cursor is None:
+        log.warning("No cursor at %s — picking up posts from the last %g day(s)",
+                    BACKFILL_CURSOR_PATH, BACKFILL_EDIT_LOOKBACK_DAYS)
+        since = run_started - timedelta(days=BACKFILL_EDIT_LOOKBACK_DAYS)
+        cursor = {"last_post_id": None, "last_run_at": since.isoformat()}
+
+    log.info("Fetching posts since post %s / %s...", cursor["last_post_id"], cursor["last_run_at"])
+    posts, newest_id = fetch_posts_since(cursor)
+    log.info("Found %d new or edited post(s)", len(posts))
+
+    all_projects: list[dict] = []
+    failed = []
+    for member, projects in extract_posts([posts]):
+        if projects is None:
+            failed.append(member)
+            continue
+        if projects:
+            log.info("  Found %d project(s) for @%s: %s",
+                     len(projects), member, ", ".join(p["name"] for p in projects))
+            all_projects.extend(projects)
+
+    if all_projects:
+        merge_into_wiki(all_projects, log_row_changes, dry_run)
+    if dry_run:
+        log.info("Dry run: not advancing the cursor")
+        log_run_stats()
+        return
+
+    # Only advance once the wiki has everything up to newest_id; merging is
+    # idempotent, so the next run can safely redo the members that succeeded
+    if failed:
+        log.error("Extraction failed for %s — not advancing the cursor",
+                  ", ".join(f"@{m}" for m in failed))
+    else:
+        save_cursor(newest_id, run_started)
+    log_run_stats()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Backfill AIC Project Directory")
     parser.add_argument(
@@ -370,43 +773,129 @@ def main():
         action="store_true",
         help="Create the pinned wiki topic directly (default: preview to stdout)",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Continue from the checkpoint journal ({BACKFILL_CHECKPOINT_PATH}) of an interrupted run",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Merge posts created or edited since the last run ({BACKFILL_CURSOR_PATH}) into the wiki post",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Merge the results into the existing wiki post (WIKI_POST_ID) and print a row-level diff",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --apply or --incremental: print the row-level diff but don't write the wiki or cursor",
+    )
     args = parser.parse_args()
 
-    log.info("Starting backfill — fetching all topics...")
-    topics = fetch_all_topics()
-
-    # Fetch all posts from all topics
-    log.info("Fetching posts from %d topics...", len(topics))
-    all_posts: list[dict] = []
-    for topic in topics:
-        topic_id = topic["id"]
-        posts = fetch_topic_posts(topic_id)
-        # Filter out system posts
-        posts = [p for p in posts if p["username"] not in ("system", DISCOURSE_API_USERNAME)]
-        all_posts.extend(posts)
-        time.sleep(0.3)
-
-    log.info("Fetched %d posts total (excluding system)", len(all_posts))
-
-    # Group posts by member
-    by_member: dict[str, list[dict]] = defaultdict(list)
-    for post in all_posts:
-        by_member[post["username"]].append(post)
-
-    log.info("Found posts from %d members", len(by_member))
+    if args.dry_run and not (args.apply or args.incremental):
+        parser.error("--dry-run needs --apply or --incremental")
+
+    if args.apply:
+        if args.create_topic:
+            parser.error("--apply cannot be combined with --create-topic")
+        if not WIKI_POST_ID:
+            parser.error("--apply needs WIKI_POST_ID")
+
+    if args.incremental:
+        if args.create_topic or args.resume or args.apply:
+            parser.error("--incremental cannot be combined with --create-topic, --resume or --apply")
+        if not WIKI_POST_ID:
+            parser.error("--incremental needs WIKI_POST_ID")
+        run_incremental(args.dry_run)
+        return
+
+    run_started = datetime.now(timezone.utc)
+    journal = CheckpointJournal(BACKFILL_CHECKPOINT_PATH)
+    checkpoint = journal.resume() if args.resume else journal.start_fresh()
+    if args.create_topic and checkpoint.created_topic:
+        journal.close()
+        parser.error(
+            f"this run already created wiki topic {checkpoint.created_topic['topic_id']}; "
+            f"merge into it with --apply --resume and WIKI_POST_ID={checkpoint.created_topic['post_id']}"
+        )
+
+    if checkpoint.topic_ids is not None:
+        topic_ids = checkpoint.topic_ids
+    else:
+        log.info("Starting backfill — fetching all topics...")
+        topics = fetch_all_topics()
+        if topics is None:
+            # Nothing is journaled yet, so --resume lists the topics again
+            journal.close()
+            print("\nThe topic list is incomplete; nothing was published. "
+                  "Run the same command again to retry.", file=sys.stderr)
+            sys.exit(1)
+        topic_ids = [t["id"] for t in topics]
+        journal.record_topics(topic_ids)
 
-    # Extract projects per member
     all_projects: list[dict] = []
-    for member, posts in sorted(by_member.items()):
-        log.info("Extracting projects for @%s (%d posts)...", member, len(posts))
-        projects = extract_projects_batch(member, posts)
+    for member, projects in sorted(checkpoint.members.items()):
+        log.info("Using checkpointed extraction for @%s (%d project(s))", member, len(projects))
+        all_projects.extend(projects)
+
+    # Crawl, spool and extract as one stream: extraction of prolific members
+    # starts while topics are still being fetched
+    progress = CrawlProgress()
+    member_count = len(checkpoint.members)
+    failed = []
+    for member, projects in extract_posts(crawl_posts(topic_ids, checkpoint, journal, progress)):
+        member_count += 1
+        if projects is None:
+            # Not journaled, so --resume retries this member
+            failed.append(member)
+            continue
+        # With a topic still unfetched this result is incomplete: leave it
+        # out of the journal so --resume re-extracts the member in full
+        if not progress.failed_topics:
+            journal.record_member(member, projects)
         if projects:
-            log.info("  Found %d project(s): %s",
-                     len(projects), ", ".join(p["name"] for p in projects))
+            log.info("  Found %d project(s) for @%s: %s",
+                     len(projects), member, ", ".join(p["name"] for p in projects))
             all_projects.extend(projects)
-        time.sleep(1)  # Rate limit for Claude API
 
-    log.info("Total: %d projects from %d members", len(all_projects), len(by_member))
+    log.info("Total: %d projects from %d members (%d posts crawled, excluding system)",
+             len(all_projects), member_count, progress.posts)
+    log_run_stats()
+
+    # A directory missing some members' posts is never published, and the
+    # cursor is only seeded by a run that covered every post
+    if progress.failed_topics or failed:
+        journal.close()
+        if progress.failed_topics:
+            log.error("Could not fetch %d topic(s): %s", len(progress.failed_topics),
+                      ", ".join(str(tid) for tid in sorted(progress.failed_topics)))
+        if failed:
+            log.error("Extraction failed for %d member(s): %s", len(failed),
+                      ", ".join(f"@{m}" for m in sorted(failed)))
+        problems = []
+        if progress.failed_topics:
+            problems.append(f"{len(progress.failed_topics)} topic(s) could not be fetched")
+        if failed:
+            problems.append(f"{len(failed)} member(s) could not be extracted")
+        print(f"\n{' and '.join(problems)}; nothing was published. "
+              "Run the same command again with --resume to retry them.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.apply:
+        log.info("Merging into wiki post %s...", WIKI_POST_ID)
+        changes = merge_into_wiki(all_projects, print_row_changes, args.dry_run)
+        journal.close()
+        if args.dry_run:
+            print(f"\nDry run: {len(changes)} row(s) would change in wiki post {WIKI_POST_ID}",
+                  file=sys.stderr)
+            return
+        save_cursor(progress.newest_post_id, run_started)
+        print(f"\n{len(changes)} row(s) changed in wiki post {WIKI_POST_ID}"
+              if changes else "\nWiki post already up to date", file=sys.stderr)
+        return
 
     # Render the wiki post
     wiki_content = render_wiki_post(all_projects)
@@ -414,6 +903,11 @@ def main():
     if args.create_topic:
         log.info("Creating pinned wiki topic...")
         result = create_wiki_topic(wiki_content)
+        # A --resume of this run must merge into the new topic, not create another
+        journal.record_created_topic(result["topic_id"], result["post_id"])
+        journal.close()
+        # The new topic covers every post crawled; --incremental takes it from here
+        save_cursor(progress.newest_post_id, run_started)
         print(f"\nTopic created successfully!", file=sys.stderr)
         print(f"  Topic ID: {result['topic_id']}", file=sys.stderr)
         print(f"  Post ID:  {result['post_id']}", file=sys.stderr)
@@ -422,6 +916,7 @@ def main():
         print(f"  WIKI_TOPIC_ID={result['topic_id']}", file=sys.stderr)
         print(f"  WIKI_POST_ID={result['post_id']}", file=sys.stderr)
     else:
+        journal.close()
         # Output draft to stdout for review
         print(wiki_content)
         print(f"\n--- STATS ---", file=sys.stderr)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+AIC Project Tracker — Benchmarks for the wiki parse/merge/render pipeline.
+
+Generates synthetic directories (seeded, so every run sees the same data)
+and times the work every wiki update does: parsing the post, merging a
+batch of new projects, rendering it back (both the tracker's tier-based
+render and backfill's render from extracted projects), re-rendering after
+a one-row edit with WikiRenderer, and normalize_name.
+Reports the best time of several runs, throughput and peak memory, and
+compares against a baseline file to flag regressions.
+
+Usage:
+    python bench_wiki.py                          # compare with bench-baseline.json
+    python bench_wiki.py --sizes 100 1000         # quick run
+    python bench_wiki.py --save-baseline          # record new baseline numbers
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from wiki import (
+    build_project_index,
+    merge_projects,
+    normalize_name,
+    parse_wiki_tables,
+    render_wiki_post,
+    tiers_from_projects,
+    WikiRenderer,
+)
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+# Share of rows in products_and_tools / active_experiments / explorations
+TIER_MIXES = {
+    "even": (1, 1, 1),
+    "early": (1, 2, 7),
+    "mature": (6, 3, 1),
+}
+TIERS = ("products_and_tools", "active_experiments", "explorations")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench-baseline.json")
+
+WORDS = ["agent", "atlas", "bot", "claude", "cli", "deck", "echo", "flow", "forge", "garden",
+         "hub", "journal", "kit", "lens", "loom", "map", "mint", "notes", "orbit", "pilot",
+         "pulse", "quill", "relay", "scout", "sketch", "studio", "sync", "tide", "vault", "wiki"]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+
+def make_tiers(size: int, mix: str, seed: int = 0) -> dict[str, list[dict]]:
+    """A directory of `size` rows split across tiers by `mix`, with 0-8 post links each."""
+    rng = random.Random(f"{size}-{mix}-{seed}")
+    tiers: dict[str, list[dict]] = {tier: [] for tier in TIERS}
+    weights = TIER_MIXES[mix]
+    for i in range(size):
+        tier = rng.choices(TIERS, weights)[0]
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}"
+        # Most rows have one or two links; a few long-running projects have many
+        link_count = min(8, int(rng.expovariate(0.6)))
+        links = ", ".join(
+            f"[Post](https://community.example/t/{rng.randint(1, 5000)}/{rng.randint(1, 80)})"
+            for _ in range(link_count)
+        )
+        tiers[tier].append({
+            "project": name,
+            "url": f"https://{name.split()[0].lower()}{i}.example" if rng.random() < 0.4 else "",
+            "member": f"@member{rng.randint(1, max(10, size // 5))}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 20))),
+            "links": links,
+        })
+    return tiers
+
+
+def make_new_projects(tiers: dict[str, list[dict]], count: int, seed: int = 0) -> list[dict]:
+    """Extraction output for a merge: half updates to existing rows, half new projects."""
+    rng = random.Random(f"new-{count}-{seed}")
+    rows = [(tier, entry) for tier, entries in tiers.items() for entry in entries]
+    projects = []
+    for i in range(count):
+        if rows and i % 2 == 0:
+            tier, entry = rng.choice(rows)
+            projects.append({"name": entry["project"], "member": entry["member"], "tier": tier,
+                             "description": entry["description"] + " and more", "url": ""})
+        else:
+            projects.append({"name": f"Fresh {rng.choice(WORDS)} {i}", "member": f"@newbie{i}",
+                             "tier": rng.choice(TIERS), "description": "A brand new project",
+                             "url": "https://fresh.example"})
+    return projects
+
+
+def as_extracted(tiers: dict[str, list[dict]]) -> list[dict]:
+    """The same rows in backfill's extracted-project shape."""
+    return [
+        {"name": entry["project"], "url": entry["url"], "member": entry["member"], "tier": tier,
+         "description": entry["description"], "links": entry["links"]}
+        for tier, entries in tiers.items() for entry in entries
+    ]
+
+
+def copy_tiers(tiers: dict[str, list[dict]]) -> dict[str, list[dict]]:
+    return {tier: [dict(entry) for entry in entries] for tier, entries in tiers.items()}
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def best_time(fn: Callable[[], object], setup: Callable[[], tuple] | None, repeat: int) -> float:
+    """Best wall time of `repeat` runs; setup() output is passed as args and not timed."""
+    best = float("inf")
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn: Callable[[], object], setup: Callable[[], tuple] | None) -> int:
+    """Peak bytes allocated while running fn once (tracemalloc; not timed)."""
+    args = setup() if setup else ()
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(size: int, mix: str, merge_count: int, repeat: int) -> dict[str, dict]:
+    tiers = make_tiers(size, mix)
+    raw = render_wiki_post(tiers)
+    extracted = as_extracted(tiers)
+    new_projects = make_new_projects(tiers, merge_count)
+    names = [entry["project"] for entries in tiers.values() for entry in entries]
+
+    def merge(existing):
+        index = build_project_index(existing)
+        for proj in new_projects:
+            merge_projects(existing, [proj], "https://community.example/t/1/1", index)
+
+    def warm_renderer():
+        """A renderer that has seen `tiers`, plus a copy with one row edited."""
+        renderer = WikiRenderer()
+        renderer.render(tiers)
+        changed = copy_tiers(tiers)
+        entries = max(changed.values(), key=len)
+        if entries:
+            entries[len(entries) // 2]["description"] += " (updated)"
+        return renderer, changed
+
+    def normalize_all():
+        for name in names:
+            normalize_name(name)
+
+    ops = {
+        "parse": (lambda: parse_wiki_tables(raw), None, size),
+        "merge": (merge, lambda: (copy_tiers(tiers),), merge_count),
+        "render": (lambda: render_wiki_post(tiers), None, size),
+        "render_incremental": (lambda renderer, changed: renderer.render(changed), warm_renderer, size),
+        "render_backfill": (lambda: render_wiki_post(tiers_from_projects(extracted)), None, size),
+        "normalize_name": (normalize_all, None, size),
+    }
+    results = {}
+    for op, (fn, setup, items) in ops.items():
+        seconds = best_time(fn, setup, repeat)
+        results[op] = {
+            "ms": round(seconds * 1000, 3),
+            "items_per_s": round(items / seconds) if seconds else None,
+            "peak_kib": round(peak_memory(fn, setup) / 1024, 1),
+        }
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_ms: float) -> list[str]:
+    """Cases whose time grew by more than `tolerance` (0.25 = 25%) and `min_ms` over the baseline.
+
+    The absolute floor keeps scheduler noise on sub-millisecond cases from
+    counting as a regression.
+    """
+    regressions = []
+    for case, ops in results.items():
+        for op, stats in ops.items():
+            old = baseline.get(case, {}).get(op)
+            if not old or not old["ms"]:
+                continue
+            if stats["ms"] > old["ms"] * (1 + tolerance) and stats["ms"] - old["ms"] > min_ms:
+                regressions.append(f"{case} {op}: {old['ms']:.2f}ms -> {stats['ms']:.2f}ms "
+                                   f"(+{100 * (stats['ms'] / old['ms'] - 1):.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark wiki parse/merge/render")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Directory rows")
+    parser.add_argument("--mixes", nargs="+", choices=sorted(TIER_MIXES), default=sorted(TIER_MIXES))
+    parser.add_argument("--merge-count", type=int, default=20, help="New projects per merge")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per measurement (best is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Slowdown over baseline that counts as a regression")
+    parser.add_argument("--min-ms", type=float, default=1.0,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<14} {'op':<18} {'best ms':>10} {'items/s':>12} {'peak KiB':>10}")
+    for size in args.sizes:
+        for mix in args.mixes:
+            case = f"{size}/{mix}"
+            results[case] = run_case(size, mix, args.merge_count, args.repeat)
+            for op, stats in results[case].items():
+                print(f"{case:<14} {op:<18} {stats['ms']:>10.2f} "
+                      f"{stats['items_per_s'] or 0:>12,} {stats['peak_kib']:>10,.1f}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "merge_count": args.merge_count,
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    regressions = compare(results, baseline["results"], args.tolerance, args.min_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.baseline} "
+              f"(python {baseline.get('python')}, {baseline.get('machine')}):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions over {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+AIC Project Tracker — Backfill checkpoint journal.
+
+An append-only JSONL file recording each unit of finished backfill
+work (the topic list, each topic's posts, each member's extraction,
+the wiki topic once it is created),
+so `backfill.py --resume` can pick up where a crashed or interrupted
+run stopped instead of re-crawling Discourse and re-paying for Claude.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Iterator
+
+log = logging.getLogger("checkpoint")
+
+
+class CheckpointState:
+    """Work recovered from a journal. Fetched posts stay on disk; see replay_topics()."""
+
+    def __init__(self):
+        self.topic_ids: list[int] | None = None
+        self.fetched_topics: set[int] = set()
+        self.members: dict[str, list[dict]] = {}
+        # {"topic_id", "post_id"} of the wiki topic this run created, if any
+        self.created_topic: dict | None = None
+
+
+class CheckpointJournal:
+    """Append-only record of completed backfill steps."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def start_fresh(self) -> CheckpointState:
+        """Discard any previous journal and start recording a new run."""
+        self._file = open(self.path, "w")
+        return CheckpointState()
+
+    def resume(self) -> CheckpointState:
+        """Replay the existing journal and keep appending to it."""
+        state = CheckpointState()
+        if not os.path.exists(self.path):
+            log.info("No checkpoint at %s — starting from scratch", self.path)
+            return self.start_fresh()
+
+        for record in self._records():
+            kind = record.get("type")
+            if kind == "topics":
+                state.topic_ids = record["topic_ids"]
+            elif kind == "topic":
+                state.fetched_topics.add(record["topic_id"])
+            elif kind == "member":
+                state.members[record["member"]] = record["projects"]
+            elif kind == "created_topic":
+                state.created_topic = {"topic_id": record["topic_id"], "post_id": record["post_id"]}
+
+        log.info("Resuming from %s: %s topics listed, %d fetched, %d members extracted",
+                 self.path, "all" if state.topic_ids is not None else "no",
+                 len(state.fetched_topics), len(state.members))
+        self._drop_partial_line()
+        self._file = open(self.path, "a")
+        return state
+
+    def replay_topics(self) -> Iterator[tuple[int, list[dict]]]:
+        """Yield (topic_id, posts) for every journaled topic, reading one line at a time."""
+        for record in self._records():
+            if record.get("type") == "topic":
+                yield record["topic_id"], record["posts"]
+
+    def record_topics(self, topic_ids: list[int]) -> None:
+        self._append({"type": "topics", "topic_ids": topic_ids})
+
+    def record_topic(self, topic_id: int, posts: list[dict]) -> None:
+        self._append({"type": "topic", "topic_id": topic_id, "posts": posts})
+
+    def record_member(self, member: str, projects: list[dict]) -> None:
+        self._append({"type": "member", "member": member, "projects": projects})
+
+    def record_created_topic(self, topic_id: int, post_id: int) -> None:
+        self._append({"type": "created_topic", "topic_id": topic_id, "post_id": post_id})
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _records(self) -> Iterator[dict]:
+        with open(self.path) as f:
+            for lineno, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves at most one partial trailing line
+                    log.warning("Ignoring unreadable checkpoint line %d", lineno)
+
+    def _drop_partial_line(self) -> None:
+        """Cut off a record left half-written by a crash, so the next one starts on its own line."""
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                step = min(65536, pos)
+                pos -= step
+                f.seek(pos)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    pos += newline + 1
+                    break
+            if pos < end:
+                log.warning("Dropping %d byte(s) of a partly written checkpoint record", end - pos)
+                f.truncate(pos)
+
+    def _append(self, record: dict) -> None:
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
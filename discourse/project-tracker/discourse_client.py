@@ -0,0 +1,197 @@
+"""
+AIC Project Tracker — Shared Discourse API client.
+
+One keep-alive requests.Session per process, with a bounded connection
+pool, retries with jittered exponential backoff (honoring Retry-After),
+and per-endpoint call timing. Used by tracker.py and backfill.py.
+An optional AdaptiveRateLimiter paces every request the client sends.
+"""
+
+import email.utils
+import logging
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ratelimit import AdaptiveRateLimiter
+
+log = logging.getLogger("discourse-client")
+
+# Statuses that mean "slow down" to a rate limiter
+THROTTLE_STATUSES = {429, 503}
+
+# Statuses worth retrying. POST is only retried on 429, where Discourse
+# guarantees it did nothing; a 5xx on POST may already have created the post.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE", "HEAD"}
+
+ID_SEGMENT_RE = re.compile(r"/\d+(?=[/.]|$)")
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Group calls by endpoint: 'GET /posts/123.json' -> 'GET /posts/:id.json'."""
+    return f"{method} {ID_SEGMENT_RE.sub('/:id', path.split('?', 1)[0])}"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class EndpointTiming:
+    """Running call count, error count and latency for one endpoint."""
+
+    __slots__ = ("calls", "errors", "retries", "total_seconds", "max_seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(1000 * self.total_seconds / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(1000 * self.max_seconds, 1),
+        }
+
+
+class DiscourseClient:
+    """Pooled, retrying client for the Discourse REST API."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        api_username: str,
+        pool_size: int = 4,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        timeout: float = 30.0,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Api-Key": api_key,
+            "Api-Username": api_username,
+            "Content-Type": "application/json",
+        })
+        # pool_block caps concurrent connections to Discourse at pool_size;
+        # extra callers wait for a free connection instead of opening more
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount(self.base_url, adapter)
+
+        self._timings: dict[str, EndpointTiming] = {}
+        self._timings_lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: dict | None = None,
+        raise_for_status: bool = True,
+    ) -> requests.Response:
+        """Send a request, retrying transient failures. Returns the final response."""
+        method = method.upper()
+        url = f"{self.base_url}{path}"
+        timing = self._timing(endpoint_name(method, path))
+
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            start = time.monotonic()
+            try:
+                resp = self.session.request(method, url, json=json, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(timing, time.monotonic() - start, error=True)
+                if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                log.warning("%s %s failed (%s) — retrying in %.1fs", method, path, e, delay)
+            else:
+                failed = resp.status_code >= 400
+                self._record(timing, time.monotonic() - start, error=failed)
+                if self.rate_limiter:
+                    if resp.status_code in THROTTLE_STATUSES:
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        self.rate_limiter.on_throttle(retry_after)
+                    elif not failed:
+                        self.rate_limiter.on_success()
+                retryable = resp.status_code in RETRY_STATUSES and (
+                    method in IDEMPOTENT_METHODS or resp.status_code == 429
+                )
+                if not retryable or attempt >= self.max_retries:
+                    if raise_for_status:
+                        resp.raise_for_status()
+                    return resp
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = min(retry_after, self.backoff_max) + random.uniform(0, 1)
+                else:
+                    delay = self._backoff(attempt)
+                log.warning("%s %s returned %d — retrying in %.1fs",
+                            method, path, resp.status_code, delay)
+
+            with self._timings_lock:
+                timing.retries += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, path: str) -> dict:
+        """GET from Discourse API."""
+        return self.request("GET", path).json()
+
+    def put(self, path: str, data: dict) -> dict:
+        """PUT to Discourse API."""
+        return self.request("PUT", path, json=data).json()
+
+    def post(self, path: str, data: dict) -> dict:
+        """POST to Discourse API."""
+        return self.request("POST", path, json=data).json()
+
+    def timings(self) -> dict[str, dict]:
+        """Per-endpoint call statistics since startup."""
+        with self._timings_lock:
+            return {name: t.as_dict() for name, t in sorted(self._timings.items())}
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads out retries from concurrent workers
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _timing(self, name: str) -> EndpointTiming:
+        with self._timings_lock:
+            return self._timings.setdefault(name, EndpointTiming())
+
+    def _record(self, timing: EndpointTiming, seconds: float, error: bool) -> None:
+        with self._timings_lock:
+            timing.calls += 1
+            timing.errors += error
+            timing.total_seconds += seconds
+            timing.max_seconds = max(timing.max_seconds, seconds)
@@ -0,0 +1,123 @@
+"""
+AIC Project Tracker — Content-addressed extraction cache.
+
+Stores Claude's project extractions in SQLite, keyed by a hash of the
+normalized post text, the member, the system prompt and the model. A
+post_edited webhook for a typo fix, or a second backfill run over the
+same posts, then returns the earlier result instead of paying for
+another call. tracker.py and backfill.py use the same file, but each
+keys entries by its own prompt, so neither answers the other's posts.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+log = logging.getLogger("extraction-cache")
+
+# Evictions are cheap but not free; run them every this many writes
+EVICT_EVERY = 100
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so reflowed or re-indented posts hash the same."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class ExtractionCache:
+    """SQLite-backed cache of extraction results with TTL and size eviction."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS extractions_used_at ON extractions (used_at)")
+        self._db.commit()
+        self.evict()
+
+    @staticmethod
+    def key(text: str, username: str, prompt: str, model: str) -> str:
+        """Cache key for one extraction request.
+
+        The full prompt is hashed in, so editing a prompt invalidates
+        everything extracted with the old wording.
+        """
+        prompt_version = hashlib.sha256(prompt.encode()).hexdigest()
+        material = json.dumps(
+            [normalize_text(text), username.lstrip("@").lower(), prompt_version, model]
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> list[dict] | None:
+        """Return the cached projects for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, created_at FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE extractions SET used_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, projects: list[dict]) -> None:
+        """Store the projects extracted for key."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extractions (key, result, created_at, used_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(projects), now, now),
+            )
+            self._db.commit()
+            self._writes += 1
+            due = self._writes % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        with self._lock:
+            expired = self._db.execute(
+                "DELETE FROM extractions WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            ).rowcount
+            overflow = self._db.execute(
+                "DELETE FROM extractions WHERE key IN ("
+                " SELECT key FROM extractions ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self._db.commit()
+        if expired or overflow:
+            log.info("Extraction cache evicted %d expired and %d overflow entries", expired, overflow)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
@@ -0,0 +1,139 @@
+"""
+AIC Project Tracker — Claude call accounting.
+
+Wraps client.messages.create to mark the static system prompt as
+cacheable and to record input/output/cached token counts and latency
+for every call, summarized per (model, mode). The rolling summary is
+logged periodically and written to a JSON stats file. Shared by
+tracker.py and backfill.py.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger("llm-usage")
+
+# Latency percentiles are computed over this many recent calls per (model, mode)
+LATENCY_WINDOW = 500
+LOG_EVERY = 50
+WRITE_INTERVAL = 30.0
+
+
+def cacheable_system(prompt: str) -> list[dict]:
+    """System prompt block marked for prompt caching.
+
+    Caching only kicks in once the prefix reaches the model's minimum
+    cacheable length; below it the API silently ignores the marker, which
+    shows up here as zero cache_read tokens.
+    """
+    return [{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class UsageStats:
+    """Token and latency totals for one (model, mode)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def as_dict(self) -> dict:
+        latencies = list(self.latencies)
+        prompt_tokens = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "cache_hit_ratio": round(self.cache_read_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+            "latency_p50_s": round(percentile(latencies, 50), 3),
+            "latency_p95_s": round(percentile(latencies, 95), 3),
+        }
+
+
+class UsageTracker:
+    """Records every extraction call and keeps a rolling summary."""
+
+    def __init__(self, stats_path: str = ""):
+        self.stats_path = stats_path
+        self._stats: dict[tuple[str, str], UsageStats] = {}
+        self._lock = threading.Lock()
+        self._total_calls = 0
+        self._last_write = 0.0
+
+    def create(self, client, mode: str, *, system: str, **kwargs):
+        """client.messages.create with a cacheable system prompt, timed and recorded."""
+        model = kwargs["model"]
+        start = time.monotonic()
+        try:
+            message = client.messages.create(system=cacheable_system(system), **kwargs)
+        except Exception:
+            self._record(model, mode, time.monotonic() - start, usage=None)
+            raise
+        self._record(model, mode, time.monotonic() - start, usage=message.usage)
+        return message
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {f"{model}/{mode}": s.as_dict() for (model, mode), s in sorted(self._stats.items())}
+
+    def log_summary(self) -> None:
+        for name, stats in self.summary().items():
+            log.info("Claude usage %s: %s", name, stats)
+
+    def write_stats(self) -> None:
+        """Write the current summary to the stats file (atomically)."""
+        if not self.stats_path:
+            return
+        tmp_path = f"{self.stats_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"updated_at": time.time(), "usage": self.summary()}, f, indent=2)
+            os.replace(tmp_path, self.stats_path)
+        except OSError as e:
+            log.warning("Could not write usage stats %s: %s", self.stats_path, e)
+
+    def _record(self, model: str, mode: str, seconds: float, usage) -> None:
+        with self._lock:
+            stats = self._stats.setdefault((model, mode), UsageStats())
+            stats.calls += 1
+            stats.latencies.append(seconds)
+            if usage is None:
+                stats.errors += 1
+            else:
+                stats.input_tokens += usage.input_tokens or 0
+                stats.output_tokens += usage.output_tokens or 0
+                stats.cache_read_tokens += getattr(usage, "cache_read_input_tokens", 0) or 0
+                stats.cache_write_tokens += getattr(usage, "cache_creation_input_tokens", 0) or 0
+            self._total_calls += 1
+            should_log = self._total_calls % LOG_EVERY == 0
+            now = time.monotonic()
+            should_write = now - self._last_write >= WRITE_INTERVAL
+            if should_write:
+                self._last_write = now
+
+        if usage is not None:
+            log.info("Claude %s/%s: %.2fs, %d in, %d out, %d cached", model, mode, seconds,
+                     usage.input_tokens or 0, usage.output_tokens or 0,
+                     getattr(usage, "cache_read_input_tokens", 0) or 0)
+        if should_log:
+            self.log_summary()
+        if should_write:
+            self.write_stats()
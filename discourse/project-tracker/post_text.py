@@ -0,0 +1,191 @@
+"""
+AIC Project Tracker — Compact post text for extraction.
+
+Claude only needs what a member actually wrote. Raw markdown is used when
+Discourse provides it; otherwise the cooked HTML is converted to plain
+text. Either way, quoted replies, images and onebox previews are dropped,
+and link URLs are kept (a project's URL is often the most useful part of
+a post). Shared by tracker.py and backfill.py.
+"""
+
+import re
+from html.parser import HTMLParser
+
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+TRAILING_SPACE_RE = re.compile(r"[ \t]+$", re.M)
+
+
+def squeeze(text: str) -> str:
+    """Strip trailing spaces and collapse runs of blank lines."""
+    return BLANK_LINES_RE.sub("\n\n", TRAILING_SPACE_RE.sub("", text)).strip()
+
+
+# ---------------------------------------------------------------------------
+# Raw markdown
+# ---------------------------------------------------------------------------
+
+QUOTE_TAG_RE = re.compile(r"\[(/?)quote[^\]]*\]", re.I)
+MARKDOWN_DROP_RES = [
+    re.compile(r"^[ \t]*>.*\n?", re.M),
+    re.compile(r"!\[[^\]]*\]\([^)]*\)"),  # Images, incl. upload:// references
+    re.compile(r"<!--.*?-->", re.S),
+]
+
+
+def drop_quotes(raw: str) -> str:
+    """Remove [quote] blocks, including quotes nested inside them."""
+    kept = []
+    depth = 0
+    pos = start = 0
+    for match in QUOTE_TAG_RE.finditer(raw):
+        if not match.group(1):
+            if not depth:
+                kept.append(raw[pos:match.start()])
+                start = match.start()
+            depth += 1
+        elif depth:
+            depth -= 1
+            if not depth:
+                pos = match.end()
+    # A quote that is never closed is left as written
+    kept.append(raw[start:] if depth else raw[pos:])
+    return "".join(kept)
+
+
+def compact_markdown(raw: str) -> str:
+    """Drop quotes, images and comments from raw markdown."""
+    raw = drop_quotes(raw)
+    for drop_re in MARKDOWN_DROP_RES:
+        raw = drop_re.sub("", raw)
+    return squeeze(raw)
+
+
+# ---------------------------------------------------------------------------
+# Cooked HTML
+# ---------------------------------------------------------------------------
+
+VOID_TAGS = {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+             "param", "source", "track", "wbr"}
+BLOCK_TAGS = {"details", "div", "h1", "h2", "h3", "h4", "h5", "h6", "li", "ol", "p",
+              "pre", "summary", "table", "tr", "ul"}
+SKIP_TAGS = {"blockquote", "script", "style", "svg"}
+# Quote asides, image lightboxes (with their filename/size captions) and link click counters
+SKIP_CLASSES = {"quote", "lightbox-wrapper", "lightbox", "meta", "clicks"}
+# Links whose text already says everything
+TEXT_ONLY_LINK_CLASSES = {"mention", "mention-group", "hashtag", "hashtag-cooked"}
+WHITESPACE_RE = re.compile(r"[ \t\r\n]+")
+
+
+def is_web_url(url: str | None) -> bool:
+    return bool(url) and url.startswith(("http://", "https://"))
+
+
+class CookedTextParser(HTMLParser):
+    """Collects the member-written text of a cooked post."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip_depth = 0
+        self._onebox_needs_url = False
+        self._pre_depth = 0
+        # (href to append after the link text, index of the text's first part)
+        self._links: list[tuple[str | None, int]] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = set((attrs.get("class") or "").split())
+
+        if self._skip_depth:
+            # A onebox without data-onebox-src: keep the first link inside it
+            if self._onebox_needs_url and tag == "a" and is_web_url(attrs.get("href")):
+                self._add_line(attrs["href"])
+                self._onebox_needs_url = False
+            if tag not in VOID_TAGS:
+                self._skip_depth += 1
+            return
+
+        if tag in VOID_TAGS:
+            if tag in ("br", "hr"):
+                self.parts.append("\n")
+            return
+
+        onebox = any("onebox" in c for c in classes)
+        if tag in SKIP_TAGS or classes & SKIP_CLASSES or onebox:
+            self._skip_depth = 1
+            if onebox:
+                url = attrs.get("data-onebox-src") or attrs.get("href")
+                if is_web_url(url):
+                    self._add_line(url)
+                else:
+                    self._onebox_needs_url = True
+            return
+
+        if tag in BLOCK_TAGS:
+            self.parts.append("\n")
+        if tag == "li":
+            self.parts.append("- ")
+        elif tag == "pre":
+            self._pre_depth += 1
+        elif tag == "a":
+            href = attrs.get("href")
+            keep = is_web_url(href) and not classes & TEXT_ONLY_LINK_CLASSES
+            self._links.append((href if keep else None, len(self.parts)))
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if self._skip_depth:
+            self._skip_depth -= 1
+            if not self._skip_depth:
+                self._onebox_needs_url = False
+            return
+
+        if tag == "a" and self._links:
+            href, start = self._links.pop()
+            link_text = "".join(self.parts[start:]).strip()
+            if href and href.rstrip("/") not in link_text:
+                self.parts.append(f" ({href})" if link_text else href)
+        elif tag == "pre":
+            self._pre_depth = max(0, self._pre_depth - 1)
+        if tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if not self._pre_depth:
+            data = WHITESPACE_RE.sub(" ", data)
+            # Block boundaries leave stray spaces at line starts; <pre> keeps its indentation
+            if self._at_line_start():
+                data = data.lstrip(" ")
+        self.parts.append(data)
+
+    def _at_line_start(self) -> bool:
+        for part in reversed(self.parts):
+            if part:
+                return part.endswith("\n")
+        return True
+
+    def _add_line(self, text: str) -> None:
+        self.parts.append(f"\n{text}\n")
+
+
+def html_to_text(cooked: str) -> str:
+    """Convert cooked post HTML to plain text, keeping link URLs."""
+    parser = CookedTextParser()
+    parser.feed(cooked)
+    parser.close()
+    return squeeze("".join(parser.parts))
+
+
+# ---------------------------------------------------------------------------
+# Posts
+# ---------------------------------------------------------------------------
+
+
+def post_text(post: dict) -> str:
+    """The text to extract from for a Discourse post: raw if present, else cooked."""
+    if post.get("raw"):
+        return compact_markdown(post["raw"])
+    return html_to_text(post.get("cooked") or "")
@@ -0,0 +1,126 @@
+"""
+AIC Project Tracker — Local pre-filter for extraction calls.
+
+Scores a post on cheap keyword/regex signals ("building", "shipped",
+URLs, code fences, ...) so conversational replies can skip the Claude
+call entirely. Quoted text is ignored, since a reply quoting someone's
+launch post is not itself a project mention.
+
+Modes:
+    off      — score nothing, extract everything
+    shadow   — score and log what would be skipped, but still extract,
+               so recall can be measured against the real extractions
+    enforce  — skip posts scoring below the threshold
+"""
+
+import logging
+import re
+import threading
+
+log = logging.getLogger("prefilter")
+
+# (signal name, pattern, weight). Each signal counts at most once per post.
+SIGNALS = [
+    ("made_it", re.compile(
+        r"\b(i|we)(['’]ve| have)? (just )?(built|made|shipped|launched|released|created|"
+        r"wrote|published|open[- ]sourced)\b", re.I), 2.0),
+    ("in_progress", re.compile(
+        r"\b(building|working on|prototyp\w*|hacking on|side project|automating|"
+        r"my (own )?(app|tool|project|site|website|bot|plugin|extension|library|repo|"
+        r"startup|product|agent|script|game|cli))\b", re.I), 1.5),
+    ("exploring", re.compile(
+        r"\b(playing (with|around)|experiment\w*|tinker\w*|noodling|trying out|tried|"
+        r"thinking about (building|making)|idea for)\b", re.I), 1.0),
+    ("launch_words", re.compile(
+        r"\b(launch\w*|shipped|beta|waitlist|users|customers|available (at|on)|"
+        r"app store|v\d+(\.\d+)+)\b", re.I), 1.0),
+    ("project_url", re.compile(
+        r"https?://(www\.)?(github\.com|gitlab\.com|apps\.apple\.com|play\.google\.com|"
+        r"[\w-]+\.(vercel\.app|netlify\.app|fly\.dev|pages\.dev|github\.io))", re.I), 1.5),
+    ("url", re.compile(r"https?://", re.I), 0.5),
+    ("code", re.compile(r"```|<pre>|<code>", re.I), 0.5),
+]
+
+QUOTE_RES = [
+    re.compile(r"\[quote[^\]]*\].*?\[/quote\]", re.I | re.S),
+    re.compile(r"<aside[^>]*class=\"quote[^\"]*\"[^>]*>.*?</aside>", re.I | re.S),
+    re.compile(r"<blockquote>.*?</blockquote>", re.I | re.S),
+    re.compile(r"^\s*>.*$", re.M),
+]
+
+
+def strip_quotes(text: str) -> str:
+    """Remove quoted replies (Discourse [quote] blocks, cooked quote asides, > lines)."""
+    for quote_re in QUOTE_RES:
+        text = quote_re.sub(" ", text)
+    return text
+
+
+def score_post(text: str) -> tuple[float, list[str]]:
+    """Score a post's project signal. Returns (score, names of matched signals)."""
+    text = strip_quotes(text)
+    score = 0.0
+    matched = []
+    for name, pattern, weight in SIGNALS:
+        if pattern.search(text):
+            score += weight
+            matched.append(name)
+    return score, matched
+
+
+class PreFilter:
+    """Decides whether a post is worth an extraction call, and keeps score."""
+
+    def __init__(self, threshold: float, mode: str):
+        if mode not in ("off", "shadow", "enforce"):
+            raise ValueError(f"Unknown prefilter mode: {mode!r}")
+        self.threshold = threshold
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.counts = {
+            "scored": 0,
+            "below_threshold": 0,
+            "skipped": 0,
+            # Only known in shadow mode: extraction results for each side of the threshold
+            "extracted_with_projects": 0,
+            "below_threshold_with_projects": 0,
+        }
+
+    def should_extract(self, post_id, text: str) -> tuple[bool, float | None]:
+        """Returns (extract?, score). Score is None when the filter is off."""
+        if self.mode == "off":
+            return True, None
+        score, matched = score_post(text)
+        below = score < self.threshold
+        with self._lock:
+            self.counts["scored"] += 1
+            self.counts["below_threshold"] += below
+            self.counts["skipped"] += below and self.mode == "enforce"
+        if below:
+            verb = "Skipping" if self.mode == "enforce" else "Would skip"
+            log.info("Prefilter: %s post %s (score %.1f < %.1f, signals: %s)",
+                     verb, post_id, score, self.threshold, ", ".join(matched) or "none")
+        return self.mode != "enforce" or not below, score
+
+    def record_result(self, post_id, score: float | None, project_count: int) -> None:
+        """Record what extraction found for a scored post, to measure recall."""
+        if score is None or not project_count:
+            return
+        below = score < self.threshold
+        with self._lock:
+            self.counts["extracted_with_projects"] += 1
+            self.counts["below_threshold_with_projects"] += below
+        if below:
+            log.warning("Prefilter miss: post %s scored %.1f but had %d project(s)",
+                        post_id, score, project_count)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counts)
+        found = stats["extracted_with_projects"]
+        stats["mode"] = self.mode
+        stats["threshold"] = self.threshold
+        stats["recall"] = (
+            round(1 - stats["below_threshold_with_projects"] / found, 3) if found else None
+        )
+        return stats
@@ -0,0 +1,73 @@
+"""
+AIC Project Tracker — Adaptive token-bucket rate limiter.
+
+Shared by every request a process makes to one upstream. The rate
+climbs additively while responses are healthy and halves on a 429 (or
+503), and a Retry-After pauses all callers until it has passed, so
+throughput settles just under whatever limit the server actually
+enforces instead of a hardcoded sleep.
+"""
+
+import logging
+import threading
+import time
+
+log = logging.getLogger("ratelimit")
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe token bucket with additive-increase/multiplicative-decrease."""
+
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: float = 1.0,
+        increase: float = 0.05,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        """Back off after a 429/503; honor Retry-After for everyone sharing the limiter."""
+        with self._lock:
+            now = time.monotonic()
+            old_rate = self.rate
+            # Concurrent requests all see the same 429 burst; halve once per burst
+            if now - self._last_decrease >= 1.0:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._last_decrease = now
+            self._tokens = 0
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+        log.info("Throttled — rate %.2f -> %.2f req/s%s", old_rate, self.rate,
+                 f", pausing {retry_after:.1f}s" if retry_after else "")
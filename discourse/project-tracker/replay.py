@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+AIC Project Tracker — Record/replay stand-in for Discourse and Anthropic.
+
+A local HTTP server that sits where Discourse and the Anthropic API
+normally are. Paths are routed by their first segment:
+
+    /discourse/...   -> Discourse
+    /anthropic/...   -> Anthropic API
+    /tracker/...     -> tracker.py (webhook deliveries from Discourse)
+
+In record mode every exchange is forwarded upstream and appended to a
+JSONL archive (API keys are never written). In serve mode the archive is
+played back without any network access, optionally with injected latency
+and errors, so tracker.py and backfill.py can be benchmarked end to end.
+
+Usage:
+    # Record a backfill against the real services
+    python replay.py record --archive fixtures.jsonl &
+    DISCOURSE_URL=http://127.0.0.1:9200/discourse \\
+    ANTHROPIC_BASE_URL=http://127.0.0.1:9200/anthropic python backfill.py > /dev/null
+
+    # Play it back, with production-like latency and a few 503s
+    python replay.py serve --archive fixtures.jsonl --recorded-latency --error-rate 0.02 &
+    DISCOURSE_URL=http://127.0.0.1:9200/discourse \\
+    ANTHROPIC_BASE_URL=http://127.0.0.1:9200/anthropic python backfill.py > /dev/null
+
+    # Re-deliver recorded webhooks to a tracker.py running against `serve`
+    python replay.py send --archive fixtures.jsonl --target http://127.0.0.1:9100
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import signal
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+REPLAY_PORT = int(os.environ.get("REPLAY_PORT", "9200"))
+UPSTREAMS = {
+    "discourse": os.environ.get("DISCOURSE_URL", "https://community.adventuresinclaude.ai"),
+    "anthropic": "https://api.anthropic.com",
+    "tracker": "http://127.0.0.1:9100",
+}
+
+# Never forwarded as-is (hop-by-hop) and never recorded (credentials)
+HOP_HEADERS = {"host", "connection", "content-length", "accept-encoding", "transfer-encoding"}
+SECRET_HEADERS = {"api-key", "api-username", "x-api-key", "authorization", "cookie"}
+# Response headers worth replaying
+KEPT_RESPONSE_HEADERS = {"content-type", "retry-after"}
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler(sys.stderr)],
+)
+log = logging.getLogger("replay")
+
+
+def body_hash(body: bytes) -> str:
+    """Hash a request body, ignoring JSON key order."""
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True).encode()
+    except (ValueError, UnicodeDecodeError):
+        pass
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def encode_body(body: bytes) -> dict:
+    try:
+        return {"text": body.decode()}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode()}
+
+
+def decode_body(encoded: dict) -> bytes:
+    if "base64" in encoded:
+        return base64.b64decode(encoded["base64"])
+    return encoded.get("text", "").encode()
+
+
+# ---------------------------------------------------------------------------
+# Archive
+# ---------------------------------------------------------------------------
+
+
+class Archive:
+    """Recorded exchanges, matched by method + path and, when possible, request body.
+
+    A request whose body was seen at record time gets the response recorded
+    for that body. Otherwise (e.g. a wiki PUT carrying a fresh timestamp) the
+    recordings for the same method and path are served in recorded order,
+    repeating the last one once they run out.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._by_body: dict[tuple, list[dict]] = defaultdict(list)
+        self._by_path: dict[tuple, list[dict]] = defaultdict(list)
+        self._served: Counter = Counter()
+        self.exchanges: list[dict] = []
+
+    def load(self) -> None:
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    self._index(json.loads(line))
+        log.info("Loaded %d exchanges from %s", len(self.exchanges), self.path)
+
+    def append(self, exchange: dict) -> None:
+        line = json.dumps(exchange) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+            self._index(exchange)
+
+    def match(self, upstream: str, method: str, path: str, body: bytes) -> dict | None:
+        path_key = (upstream, method, path)
+        for key, recordings in (((*path_key, body_hash(body)), self._by_body),
+                                (path_key, self._by_path)):
+            candidates = recordings.get(key)
+            if candidates:
+                with self._lock:
+                    n = self._served[key]
+                    self._served[key] += 1
+                return candidates[min(n, len(candidates) - 1)]
+        return None
+
+    def _index(self, exchange: dict) -> None:
+        req = exchange["request"]
+        path_key = (exchange["upstream"], req["method"], req["path"])
+        self._by_body[(*path_key, req["body_hash"])].append(exchange)
+        self._by_path[path_key].append(exchange)
+        self.exchanges.append(exchange)
+
+
+# ---------------------------------------------------------------------------
+# Stand-in server
+# ---------------------------------------------------------------------------
+
+
+class ReplayConfig:
+    """How the server answers: record upstream, or replay with injected faults."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.mode = args.mode
+        self.latency = getattr(args, "latency", 0.0)
+        self.jitter = getattr(args, "jitter", 0.0)
+        self.recorded_latency = getattr(args, "recorded_latency", False)
+        self.speed = getattr(args, "speed", 1.0)
+        self.error_rate = getattr(args, "error_rate", 0.0)
+        self.error_status = getattr(args, "error_status", 503)
+        self.error_upstream = getattr(args, "error_upstream", "all")
+        self.retry_after = getattr(args, "retry_after", None)
+        self.random = random.Random(getattr(args, "seed", None))
+        self.stats: Counter = Counter()
+        self.stats_lock = threading.Lock()
+
+    def count(self, key: str) -> None:
+        with self.stats_lock:
+            self.stats[key] += 1
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real services, so pooled clients behave as in production
+    protocol_version = "HTTP/1.1"
+    archive: Archive
+    config: ReplayConfig
+    session = requests.Session()
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def do_PUT(self):
+        self.handle_request()
+
+    def do_DELETE(self):
+        self.handle_request()
+
+    def handle_request(self):
+        upstream, _, path = self.path.lstrip("/").partition("/")
+        path = "/" + path
+        # Read the body even when refusing, or it would be parsed as the next request
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if upstream not in UPSTREAMS:
+            self.respond(404, {"content-type": "text/plain"}, b"Unknown upstream\n")
+            return
+
+        if self.config.mode == "record":
+            self.record(upstream, path, body)
+        else:
+            self.replay(upstream, path, body)
+
+    def record(self, upstream: str, path: str, body: bytes) -> None:
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_HEADERS}
+        headers["Accept-Encoding"] = "identity"
+        start = time.monotonic()
+        try:
+            resp = self.session.request(self.command, UPSTREAMS[upstream] + path,
+                                        headers=headers, data=body or None, timeout=120)
+        except requests.RequestException as e:
+            log.warning("%s %s %s failed upstream: %s", upstream, self.command, path, e)
+            self.respond(502, {"content-type": "text/plain"}, f"{e}\n".encode())
+            return
+        elapsed = time.monotonic() - start
+
+        resp_headers = {k.lower(): v for k, v in resp.headers.items()
+                        if k.lower() in KEPT_RESPONSE_HEADERS}
+        self.archive.append({
+            "upstream": upstream,
+            "request": {
+                "method": self.command,
+                "path": path,
+                "headers": {k: v for k, v in headers.items() if k.lower() not in SECRET_HEADERS},
+                "body": encode_body(body),
+                "body_hash": body_hash(body),
+            },
+            "response": {
+                "status": resp.status_code,
+                "headers": resp_headers,
+                "body": encode_body(resp.content),
+            },
+            "elapsed": round(elapsed, 4),
+        })
+        self.config.count(f"recorded_{upstream}")
+        self.respond(resp.status_code, resp_headers, resp.content)
+
+    def replay(self, upstream: str, path: str, body: bytes) -> None:
+        config = self.config
+        exchange = self.archive.match(upstream, self.command, path, body)
+
+        delay = config.latency + config.random.uniform(0, config.jitter)
+        if config.recorded_latency and exchange:
+            delay += exchange.get("elapsed", 0.0) / config.speed
+        if delay:
+            time.sleep(delay)
+
+        if config.error_upstream in ("all", upstream) and config.random.random() < config.error_rate:
+            config.count(f"injected_{upstream}")
+            headers = {"content-type": "application/json"}
+            if config.retry_after is not None:
+                headers["retry-after"] = f"{config.retry_after:g}"
+            self.respond(config.error_status, headers, b'{"error": "injected by replay.py"}')
+            return
+
+        if exchange is None:
+            config.count(f"unmatched_{upstream}")
+            log.warning("No recording for %s %s %s", upstream, self.command, path)
+            self.respond(404, {"content-type": "application/json"}, b'{"error": "not recorded"}')
+            return
+
+        config.count(f"served_{upstream}")
+        resp = exchange["response"]
+        self.respond(resp["status"], resp["headers"], decode_body(resp["body"]))
+
+    def respond(self, status: int, headers: dict, body: bytes) -> None:
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("%s - %s", self.address_string(), format % args)
+
+
+def proxies_to_itself(port: int) -> list[str]:
+    """Upstreams whose URL is this server's own address (a forwarding loop)."""
+    looped = []
+    for name, url in UPSTREAMS.items():
+        parsed = urllib.parse.urlsplit(url)
+        default_port = 443 if parsed.scheme == "https" else 80
+        if (parsed.hostname in ("127.0.0.1", "localhost", "0.0.0.0", "::1")
+                and (parsed.port or default_port) == port):
+            looped.append(name)
+    return looped
+
+
+def run_server(args: argparse.Namespace) -> None:
+    archive = Archive(args.archive)
+    if args.mode == "serve":
+        archive.load()
+    ReplayHandler.archive = archive
+    ReplayHandler.config = config = ReplayConfig(args)
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), ReplayHandler)
+    log.info("Replay server (%s) on http://127.0.0.1:%d — /discourse, /anthropic, /tracker",
+             args.mode, args.port)
+    # serve_forever() returns once shutdown() is called from another thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        log.info("Stats: %s", dict(sorted(config.stats.items())))
+
+
+# ---------------------------------------------------------------------------
+# Webhook re-delivery
+# ---------------------------------------------------------------------------
+
+
+def send_webhooks(args: argparse.Namespace) -> None:
+    """POST every recorded webhook delivery to a running tracker.py, in recorded order."""
+    archive = Archive(args.archive)
+    archive.load()
+    deliveries = [e for e in archive.exchanges
+                  if e["upstream"] == "tracker" and e["request"]["method"] == "POST"]
+
+    statuses: Counter = Counter()
+    start = time.monotonic()
+    for exchange in deliveries:
+        req = exchange["request"]
+        resp = requests.post(args.target.rstrip("/") + req["path"], data=decode_body(req["body"]),
+                             headers=req["headers"], timeout=30)
+        statuses[resp.status_code] += 1
+        if args.interval:
+            time.sleep(args.interval)
+    log.info("Delivered %d webhooks in %.1fs: %s",
+             len(deliveries), time.monotonic() - start, dict(statuses))
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay Discourse and Anthropic traffic")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    record = sub.add_parser("record", help="Proxy to the real services and record every exchange")
+    record.add_argument("--archive", required=True, help="JSONL file to append exchanges to")
+    record.add_argument("--port", type=int, default=REPLAY_PORT)
+
+    serve = sub.add_parser("serve", help="Serve recorded exchanges back, without network access")
+    serve.add_argument("--archive", required=True)
+    serve.add_argument("--port", type=int, default=REPLAY_PORT)
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    serve.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra random seconds")
+    serve.add_argument("--recorded-latency", action="store_true",
+                       help="Also wait as long as the real upstream took when recorded")
+    serve.add_argument("--speed", type=float, default=1.0,
+                       help="Divide recorded latencies by this factor")
+    serve.add_argument("--error-rate", type=float, default=0.0,
+                       help="Fraction of requests answered with --error-status instead")
+    serve.add_argument("--error-status", type=int, default=503)
+    serve.add_argument("--error-upstream", choices=["all", *UPSTREAMS], default="all")
+    serve.add_argument("--retry-after", type=float, help="Retry-After seconds sent with injected errors")
+    serve.add_argument("--seed", type=int, help="Seed for jitter and error injection")
+
+    send = sub.add_parser("send", help="Re-deliver recorded webhooks to tracker.py")
+    send.add_argument("--archive", required=True)
+    send.add_argument("--target", default=UPSTREAMS["tracker"])
+    send.add_argument("--interval", type=float, default=0.0, help="Seconds between deliveries")
+
+    args = parser.parse_args()
+    if args.mode == "record":
+        looped = proxies_to_itself(args.port)
+        if looped:
+            parser.error(f"{', '.join(looped)} upstream points at this server (port {args.port}); "
+                         "set DISCOURSE_URL only for the process being recorded, not for replay.py")
+    if args.mode == "send":
+        send_webhooks(args)
+    else:
+        run_server(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+AIC Project Tracker — Per-member post spool for backfill.
+
+Crawled posts are appended to one JSONL file per member instead of being
+held in memory. As a member's file grows past a token budget, the spool
+hands back a reference to the finished chunk (a byte range of that file),
+so extraction can start on it while the crawl is still running. Only the
+byte offsets and running token counts are kept in memory.
+"""
+
+import json
+import os
+import re
+import shutil
+from typing import Callable, NamedTuple
+
+UNSAFE_FILENAME_RE = re.compile(r"[^\w.-]")
+
+
+class SpoolChunk(NamedTuple):
+    """A run of one member's spooled posts: bytes [start, end) of their file."""
+
+    member: str
+    start: int
+    end: int
+    count: int
+
+
+class _Pending:
+    """Posts written for a member but not yet handed out in a chunk."""
+
+    __slots__ = ("start", "end", "count", "tokens")
+
+    def __init__(self):
+        self.start = 0
+        self.end = 0
+        self.count = 0
+        self.tokens = 0
+
+
+class MemberSpool:
+    """Append-only per-member post files, cut into token-budgeted chunks."""
+
+    def __init__(self, directory: str, chunk_tokens: int, weigh: Callable[[dict], int]):
+        self.directory = directory
+        self.chunk_tokens = chunk_tokens
+        self.weigh = weigh
+        self.post_count = 0
+        self._pending: dict[str, _Pending] = {}
+        # A spool only lives for one run; anything left over is from a crashed one
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+    def add(self, member: str, post: dict) -> SpoolChunk | None:
+        """Spool a post. Returns the member's previous chunk if this post starts a new one."""
+        line = (json.dumps(post) + "\n").encode()
+        tokens = self.weigh(post)
+        pending = self._pending.setdefault(member, _Pending())
+
+        ready = None
+        if pending.count and pending.tokens + tokens > self.chunk_tokens:
+            ready = self._take(member, pending)
+
+        with open(self._path(member), "ab") as f:
+            f.write(line)
+        pending.end += len(line)
+        pending.count += 1
+        pending.tokens += tokens
+        self.post_count += 1
+        return ready
+
+    def flush(self) -> list[SpoolChunk]:
+        """Hand out every member's remaining posts as final chunks."""
+        return [self._take(member, pending)
+                for member, pending in self._pending.items() if pending.count]
+
+    def read(self, chunk: SpoolChunk) -> list[dict]:
+        with open(self._path(chunk.member), "rb") as f:
+            f.seek(chunk.start)
+            data = f.read(chunk.end - chunk.start)
+        return [json.loads(line) for line in data.splitlines()]
+
+    @property
+    def member_count(self) -> int:
+        return len(self._pending)
+
+    def close(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _take(self, member: str, pending: _Pending) -> SpoolChunk:
+        chunk = SpoolChunk(member, pending.start, pending.end, pending.count)
+        pending.start = pending.end
+        pending.count = 0
+        pending.tokens = 0
+        return chunk
+
+    def _path(self, member: str) -> str:
+        return os.path.join(self.directory, UNSAFE_FILENAME_RE.sub("_", member) + ".jsonl")
@@ -0,0 +1,59 @@
+import json
+
+from checkpoint import CheckpointJournal
+
+
+def test_resume_replays_recorded_work(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CheckpointJournal(path)
+    journal.start_fresh()
+    journal.record_topics([1, 2, 3])
+    journal.record_topic(1, [{"id": 10, "username": "al"}])
+    journal.record_member("al", [{"name": "Shipit"}])
+    journal.close()
+
+    journal = CheckpointJournal(path)
+    state = journal.resume()
+    journal.close()
+
+    assert state.topic_ids == [1, 2, 3]
+    assert state.fetched_topics == {1}
+    assert state.members == {"al": [{"name": "Shipit"}]}
+    assert list(journal.replay_topics()) == [(1, [{"id": 10, "username": "al"}])]
+
+
+def test_resume_skips_a_truncated_last_line(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = CheckpointJournal(str(path))
+    journal.start_fresh()
+    journal.record_topics([1, 2])
+    journal.record_topic(1, [{"id": 10}])
+    journal.close()
+    # A crash in the middle of writing the next record
+    partial = json.dumps({"type": "member", "member": "al", "projects": []})
+    with open(path, "a") as f:
+        f.write(partial[:20])
+
+    journal = CheckpointJournal(str(path))
+    state = journal.resume()
+
+    assert state.topic_ids == [1, 2]
+    assert state.fetched_topics == {1}
+    assert state.members == {}
+    assert list(journal.replay_topics()) == [(1, [{"id": 10}])]
+
+    # New records still land on lines of their own
+    journal.record_topic(2, [{"id": 20}])
+    journal.close()
+    state = CheckpointJournal(str(path)).resume()
+    assert state.fetched_topics == {1, 2}
+
+
+def test_resume_without_a_journal_starts_fresh(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = CheckpointJournal(str(path))
+    state = journal.resume()
+    journal.close()
+
+    assert state.topic_ids is None
+    assert path.exists()
@@ -0,0 +1,77 @@
+import pytest
+
+import extraction_cache
+from extraction_cache import ExtractionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(extraction_cache, "time", clock)
+    return clock
+
+
+def test_key_ignores_whitespace_and_member_spelling():
+    key = ExtractionCache.key("I built  Shipit\n", "@Al", "prompt", "model")
+
+    assert key == ExtractionCache.key("I built Shipit", "al", "prompt", "model")
+    assert key != ExtractionCache.key("I built Shipit", "al", "prompt, edited", "model")
+    assert key != ExtractionCache.key("I built Shipit", "al", "prompt", "other-model")
+
+
+def test_get_returns_what_was_put_and_counts_lookups(clock):
+    cache = ExtractionCache(":memory:", ttl_seconds=60, max_entries=10)
+
+    assert cache.get("k") is None
+    cache.put("k", [{"name": "Shipit"}])
+    assert cache.get("k") == [{"name": "Shipit"}]
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ExtractionCache(":memory:", ttl_seconds=60, max_entries=10)
+    cache.put("k", [])
+
+    clock.now += 60
+    assert cache.get("k") == []
+    # A hit doesn't extend the TTL, which counts from when the entry was written
+    clock.now += 1
+    assert cache.get("k") is None
+
+    cache.evict()
+    assert cache.stats()["entries"] == 0
+
+
+def test_evict_drops_the_least_recently_used_beyond_max_entries(clock):
+    cache = ExtractionCache(":memory:", ttl_seconds=3600, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, [])
+        clock.now += 1
+    cache.get("a")
+
+    cache.evict()
+
+    assert cache.get("a") == []
+    assert cache.get("b") is None
+    assert cache.get("c") == []
+
+
+def test_put_evicts_every_evict_every_writes(clock, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "EVICT_EVERY", 3)
+    cache = ExtractionCache(":memory:", ttl_seconds=3600, max_entries=1)
+
+    for key in ("a", "b"):
+        cache.put(key, [])
+        clock.now += 1
+    assert cache.stats()["entries"] == 2
+    cache.put("c", [])
+    assert cache.stats()["entries"] == 1
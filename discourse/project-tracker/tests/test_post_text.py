@@ -0,0 +1,54 @@
+from post_text import compact_markdown, html_to_text, post_text
+
+
+def test_compact_markdown_drops_quotes_images_and_comments():
+    raw = "\n".join([
+        '[quote="bo, post:1, topic:2"]',
+        "Nested: [quote]inner[/quote] still quoted",
+        "[/quote]",
+        "> an email-style quote",
+        "I shipped ![screenshot](upload://abc.png) Shipit <!-- draft note -->  ",
+        "",
+        "",
+        "",
+        "at https://shipit.example",
+    ])
+
+    assert compact_markdown(raw) == "I shipped  Shipit\n\nat https://shipit.example"
+
+
+def test_compact_markdown_keeps_an_unclosed_quote():
+    assert compact_markdown("Before [quote]never closed") == "Before [quote]never closed"
+
+
+def test_html_to_text_keeps_link_urls_and_drops_asides():
+    cooked = (
+        '<aside class="quote"><blockquote><p>quoted</p></blockquote></aside>'
+        '<p>Built <a href="https://shipit.example">Shipit</a> with '
+        '<a class="mention" href="/u/bo">@bo</a></p>'
+        '<div class="lightbox-wrapper"><a class="lightbox" href="https://d/img.png">'
+        '<img src="https://d/img.png"><div class="meta">img.png 1024x768</div></a></div>'
+        "<ul><li>one</li><li>two</li></ul>"
+        "<pre><code>  indented\n  code</code></pre>"
+    )
+
+    assert html_to_text(cooked) == (
+        "Built Shipit (https://shipit.example) with @bo\n\n- one\n\n- two\n\n  indented\n  code"
+    )
+
+
+def test_html_to_text_keeps_only_a_oneboxs_url():
+    cooked = (
+        '<aside class="onebox" data-onebox-src="https://github.com/al/shipit">'
+        "<h3>al/shipit</h3><p>Repository description</p></aside>"
+        '<aside class="onebox"><header><a href="https://other.example/page">other</a></header>'
+        "<p>Preview text</p></aside>"
+    )
+
+    assert html_to_text(cooked) == "https://github.com/al/shipit\n\nhttps://other.example/page"
+
+
+def test_post_text_prefers_raw():
+    assert post_text({"raw": "raw text", "cooked": "<p>cooked text</p>"}) == "raw text"
+    assert post_text({"raw": "", "cooked": "<p>cooked text</p>"}) == "cooked text"
+    assert post_text({}) == ""
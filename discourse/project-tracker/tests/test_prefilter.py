@@ -0,0 +1,57 @@
+import pytest
+
+from prefilter import PreFilter, score_post
+
+
+def test_score_post_counts_each_signal_once():
+    score, matched = score_post(
+        "I just shipped Shipit! Building v2 now: https://github.com/al/shipit and https://shipit.example"
+    )
+
+    assert matched == ["made_it", "in_progress", "launch_words", "project_url", "url"]
+    assert score == 2.0 + 1.5 + 1.0 + 1.5 + 0.5
+
+
+def test_score_post_ignores_quoted_text():
+    quoted = '[quote="bo, post:1, topic:2"]\nI built Shipit\n[/quote]\nCongrats!'
+    assert score_post(quoted) == (0.0, [])
+    assert score_post("> We launched it today\nNice work") == (0.0, [])
+
+
+def test_shadow_mode_extracts_everything_and_measures_recall():
+    prefilter = PreFilter(1.0, "shadow")
+
+    assert prefilter.should_extract(1, "Thanks, sounds great") == (True, 0.0)
+    assert prefilter.should_extract(2, "I built a thing") == (True, 2.0)
+    prefilter.record_result(1, 0.0, 1)  # a miss: below the threshold but had a project
+    prefilter.record_result(2, 2.0, 3)
+    prefilter.record_result(3, 2.0, 0)  # no projects: not a recall sample
+
+    stats = prefilter.stats()
+    assert (stats["scored"], stats["below_threshold"], stats["skipped"]) == (2, 1, 0)
+    assert stats["extracted_with_projects"] == 2
+    assert stats["below_threshold_with_projects"] == 1
+    assert stats["recall"] == 0.5
+
+
+def test_enforce_mode_skips_posts_below_the_threshold():
+    prefilter = PreFilter(1.0, "enforce")
+
+    assert prefilter.should_extract(1, "Thanks, sounds great") == (False, 0.0)
+    assert prefilter.should_extract(2, "I built a thing") == (True, 2.0)
+    assert prefilter.stats()["skipped"] == 1
+    assert prefilter.stats()["recall"] is None
+
+
+def test_off_mode_scores_nothing():
+    prefilter = PreFilter(1.0, "off")
+
+    assert prefilter.should_extract(1, "Thanks") == (True, None)
+    prefilter.record_result(1, None, 2)
+    assert prefilter.stats()["scored"] == 0
+    assert prefilter.stats()["extracted_with_projects"] == 0
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        PreFilter(1.0, "sometimes")
@@ -0,0 +1,72 @@
+import pytest
+
+import ratelimit
+
+
+class FakeClock:
+    """Stands in for the time module: sleep advances monotonic instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+def test_acquire_paces_requests_at_the_rate(clock):
+    limiter = ratelimit.AdaptiveRateLimiter(rate=2.0, min_rate=0.5, max_rate=10.0, burst=2.0)
+
+    for _ in range(4):
+        limiter.acquire()
+
+    # The burst goes out at once; after that one request per 1/rate seconds
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_success_increases_the_rate_additively_up_to_the_max(clock):
+    limiter = ratelimit.AdaptiveRateLimiter(rate=1.0, min_rate=0.5, max_rate=1.2, increase=0.1)
+
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(1.1)
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.rate == 1.2
+
+
+def test_throttle_halves_once_per_burst_down_to_the_min(clock):
+    limiter = ratelimit.AdaptiveRateLimiter(rate=8.0, min_rate=1.5, max_rate=10.0)
+
+    limiter.on_throttle()
+    limiter.on_throttle()  # Same burst of 429s
+    assert limiter.rate == 4.0
+
+    clock.now += 1.0
+    limiter.on_throttle()
+    assert limiter.rate == 2.0
+    clock.now += 1.0
+    limiter.on_throttle()
+    assert limiter.rate == 1.5
+
+
+def test_retry_after_pauses_every_caller(clock):
+    limiter = ratelimit.AdaptiveRateLimiter(rate=100.0, min_rate=1.0, max_rate=100.0, burst=5.0)
+    start = clock.now
+
+    limiter.on_throttle(retry_after=3.0)
+    limiter.on_throttle(retry_after=1.0)  # A shorter Retry-After doesn't cut the pause short
+    limiter.acquire()
+
+    assert clock.now - start >= 3.0
+    assert limiter.rate == 50.0
@@ -0,0 +1,251 @@
+import copy
+import random
+
+import wiki
+
+
+def row(project, member, description="", links="", url=""):
+    return {"project": project, "url": url, "member": member, "description": description, "links": links}
+
+
+def mention(name, member, tier, description="", url=None):
+    return {"name": name, "member": member, "tier": tier, "description": description, "url": url}
+
+
+def fixed_tiers():
+    return {
+        "products_and_tools": [row("Shipit", "@al", "Ships things", "[Post](https://d/t/1/1)")],
+        "active_experiments": [row("Draft Bot", "@bo", "Drafts replies")],
+        "explorations": [row("Noodle", "@cy", "An idea", url="https://noodle.example")],
+    }
+
+
+FIXED_BATCHES = [
+    ("https://d/t/2/1", [mention("shipit", "al", "products_and_tools", "Ships things, faster")]),
+    ("https://d/t/2/2", [mention("Draft-Bot", "@bo", "explorations", "A much longer description")]),
+    ("https://d/t/3/1", [mention("New Thing", "dee", "explorations", "Brand new"),
+                         mention("new thing", "@dee", "explorations", "Brand new, again")]),
+    ("https://d/t/3/2", [mention("Noodle", "cy", "explorations", "x", url="https://other.example")]),
+]
+
+
+def test_merge_projects_fixed_inputs():
+    tiers = fixed_tiers()
+    added = []
+    for post_url, projects in FIXED_BATCHES:
+        tiers, batch_added = wiki.merge_projects(tiers, projects, post_url)
+        added.extend(batch_added)
+
+    assert tiers == {
+        "products_and_tools": [
+            row("Shipit", "@al", "Ships things, faster", "[Post](https://d/t/1/1), [Post](https://d/t/2/1)"),
+        ],
+        "active_experiments": [row("Draft Bot", "@bo", "Drafts replies", "[Post](https://d/t/2/2)")],
+        "explorations": [
+            row("Noodle", "@cy", "An idea", "[Post](https://d/t/3/2)", url="https://noodle.example"),
+            row("New Thing", "@dee", "Brand new, again", "[Post](https://d/t/3/1)"),
+        ],
+    }
+    assert [p["name"] for p in added] == ["New Thing"]
+
+
+def test_merge_projects_shared_index_matches_fresh_index():
+    fresh = fixed_tiers()
+    fresh_added = []
+    for post_url, projects in FIXED_BATCHES:
+        fresh, batch_added = wiki.merge_projects(fresh, copy.deepcopy(projects), post_url)
+        fresh_added.extend(batch_added)
+
+    shared = fixed_tiers()
+    index = wiki.build_project_index(shared)
+    shared_added = []
+    for post_url, projects in FIXED_BATCHES:
+        shared, batch_added = wiki.merge_projects(shared, copy.deepcopy(projects), post_url, index)
+        shared_added.extend(batch_added)
+
+    assert shared == fresh
+    assert shared_added == fresh_added
+    assert index == wiki.build_project_index(shared)
+
+
+def test_merge_projects_keeps_the_members_tier():
+    tiers = fixed_tiers()
+    tiers, added = wiki.merge_projects(
+        tiers, [mention("Noodle", "cy", "products_and_tools", "Now shipped to real users")], "https://d/t/4/1")
+
+    assert added == []
+    assert tiers["products_and_tools"] == fixed_tiers()["products_and_tools"]
+    # Found in another tier: only the link is added, the description is the member's
+    assert tiers["explorations"] == [
+        row("Noodle", "@cy", "An idea", "[Post](https://d/t/4/1)", url="https://noodle.example"),
+    ]
+
+
+def test_merge_projects_prefers_the_row_in_the_same_tier():
+    tiers = {
+        "products_and_tools": [row("Twin", "@al", "shipped")],
+        "active_experiments": [],
+        "explorations": [row("Twin", "@al", "idea")],
+    }
+    tiers, _ = wiki.merge_projects(tiers, [mention("Twin", "al", "explorations", "a longer idea")], "")
+
+    assert tiers["products_and_tools"][0]["description"] == "shipped"
+    assert tiers["explorations"][0]["description"] == "a longer idea"
+
+
+def test_merge_projects_keeps_the_longer_description():
+    tiers = fixed_tiers()
+    tiers, _ = wiki.merge_projects(tiers, [mention("Shipit", "al", "products_and_tools", "Short")], "")
+    assert tiers["products_and_tools"][0]["description"] == "Ships things"
+
+    tiers, _ = wiki.merge_projects(
+        tiers, [mention("Shipit", "al", "products_and_tools", "Ships | things to users")], "")
+    assert tiers["products_and_tools"][0]["description"] == "Ships - things to users"
+
+
+def test_build_project_index_keeps_the_first_row_per_tier():
+    tiers = {"explorations": [row("Dup", "@al", "first"), row("dup", "al", "second")]}
+    index = wiki.build_project_index(tiers)
+    assert index == {("dup", "al"): {"explorations": tiers["explorations"][0]}}
+
+
+def test_diff_tiers_reports_each_kind():
+    old = fixed_tiers()
+    new = copy.deepcopy(old)
+    new["products_and_tools"][0]["links"] += ", [Post](https://d/t/9/1)"
+    del new["explorations"][0]
+    new["explorations"].append(row("Fresh", "@ed", "Just started"))
+
+    changes = wiki.diff_tiers(old, new)
+
+    assert changes == [
+        wiki.RowChange("changed", "products_and_tools", old["products_and_tools"][0], new["products_and_tools"][0]),
+        wiki.RowChange("added", "explorations", None, new["explorations"][0]),
+        wiki.RowChange("removed", "explorations", old["explorations"][0], None),
+    ]
+    assert [wiki.format_row_change(change)[0] for change in changes] == ["~", "+", "-"]
+
+
+def test_diff_tiers_unchanged_and_moved_rows():
+    old = fixed_tiers()
+    assert wiki.diff_tiers(old, copy.deepcopy(old)) == []
+
+    moved = copy.deepcopy(old)
+    moved["products_and_tools"].append(moved["explorations"].pop())
+    assert [(c.kind, c.tier) for c in wiki.diff_tiers(old, moved)] == [
+        ("added", "products_and_tools"), ("removed", "explorations"),
+    ]
+
+
+def test_diff_tiers_pairs_duplicate_rows_in_order():
+    old = {"explorations": [row("Dup", "@al", "one"), row("Dup", "@al", "two")]}
+    new = {"explorations": [row("Dup", "@al", "one"), row("Dup", "@al", "two, edited")]}
+
+    changes = wiki.diff_tiers(old, new)
+
+    assert changes == [wiki.RowChange("changed", "explorations", old["explorations"][1], new["explorations"][1])]
+
+
+def extracted(name, tier, description, post_urls, url="", confidence=0.8):
+    return {
+        "name": name, "url": url, "member": "@al", "description": description, "tier": tier,
+        "confidence": confidence, "links": ", ".join(f"[Post]({u})" for u in post_urls),
+        "post_urls": post_urls,
+    }
+
+
+def test_reduce_member_projects_combines_chunks():
+    first = [extracted("Shipit", "active_experiments", "Ships", ["https://d/t/1/1"], confidence=0.75)]
+    second = [
+        extracted("ship-it", "products_and_tools", "Ships things to users",
+                  ["https://d/t/1/1", "https://d/t/2/1"], url="https://shipit.example"),
+        extracted("Other", "explorations", "Something else", ["https://d/t/3/1"]),
+    ]
+
+    reduced = wiki.reduce_member_projects([first, second])
+
+    assert reduced == [
+        {
+            "name": "Shipit", "url": "https://shipit.example", "member": "@al",
+            "description": "Ships things to users", "tier": "products_and_tools", "confidence": 0.8,
+            "links": "[Post](https://d/t/1/1), [Post](https://d/t/2/1)",
+            "post_urls": ["https://d/t/1/1", "https://d/t/2/1"],
+        },
+        second[1],
+    ]
+    # The inputs are left alone
+    assert first[0]["post_urls"] == ["https://d/t/1/1"]
+
+
+def test_reduce_member_projects_never_demotes_a_tier():
+    reduced = wiki.reduce_member_projects([
+        [extracted("Shipit", "products_and_tools", "Ships", ["https://d/t/1/1"])],
+        [extracted("Shipit", "explorations", "Ships", ["https://d/t/2/1"], url="https://a.example")],
+    ])
+
+    assert len(reduced) == 1
+    assert reduced[0]["tier"] == "products_and_tools"
+    assert reduced[0]["url"] == "https://a.example"
+
+
+def test_parse_wiki_tables_skips_header_and_separator_rows():
+    content = "\n".join([
+        "# Community Project Directory",
+        "## Products & Tools",
+        "| Project | Member | Description | Links |",
+        "|---------|--------|-------------|-------|",
+        "| [Shipit](https://shipit.example) | @al | Ships things | [Post](https://d/t/1/1) |",
+        "## Explorations",
+        "| Project | Member | Description | Links |",
+        "| :------ | :----: | ----------: | ----- |",
+        "| Noodle | @cy | An idea |  |",
+    ])
+
+    tiers = wiki.parse_wiki_tables(content)
+
+    assert tiers == {
+        "products_and_tools": [
+            row("Shipit", "@al", "Ships things", "[Post](https://d/t/1/1)", url="https://shipit.example"),
+        ],
+        "active_experiments": [],
+        "explorations": [row("Noodle", "@cy", "An idea")],
+    }
+
+
+def test_parse_wiki_tables_round_trips_rendered_posts():
+    tiers = fixed_tiers()
+    assert wiki.parse_wiki_tables(wiki.render_wiki_post(tiers)) == tiers
+
+
+def without_footer(content):
+    # The footer carries the render time, which can tick over between two renders
+    return content.rsplit("\n---\n", 1)[0]
+
+
+def test_wiki_renderer_matches_render_wiki_post():
+    rng = random.Random(19)
+    renderer = wiki.WikiRenderer()
+    # Small blocks, so edits land in different blocks and tiers change length
+    renderer.BLOCK_ROWS = 4
+    tiers = fixed_tiers()
+    index = wiki.build_project_index(tiers)
+    names = [f"Project {i}" for i in range(40)]
+
+    for step in range(200):
+        if step % 50 == 49:
+            # A fresh parse, as after a hand edit: new row objects, same content
+            tiers = wiki.parse_wiki_tables(wiki.render_wiki_post(tiers))
+            index = wiki.build_project_index(tiers)
+        elif step % 25 == 24:
+            # A hand-deleted row
+            tier = rng.choice([tier for tier, rows in tiers.items() if rows])
+            del tiers[tier][rng.randrange(len(tiers[tier]))]
+            index = wiki.build_project_index(tiers)
+        projects = [
+            mention(rng.choice(names), rng.choice(["al", "bo", "cy"]), rng.choice(list(wiki.TIER_HEADERS)),
+                    "x" * rng.randrange(1, 30))
+            for _ in range(rng.randrange(1, 4))
+        ]
+        tiers, _ = wiki.merge_projects(tiers, projects, f"https://d/t/{step}/1", index)
+
+        assert without_footer(renderer.render(tiers)) == without_footer(wiki.render_wiki_post(tiers))
@@ -8,19 +8,32 @@ project mentions using Claude, and updates a pinned wiki topic.
 Runs on the Discourse droplet (24.144.80.161) as a systemd service.
 """
 
+import abc
 import hashlib
 import hmac
+import itertools
 import json
 import logging
 import os
+import queue
 import re
+import signal
 import sys
-from datetime import datetime, timezone
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 import anthropic
 import requests
 
+from discourse_client import DiscourseClient
+from extraction_cache import ExtractionCache
+from llm_usage import UsageTracker
+from metrics import MetricsRegistry
+from post_text import post_text
+from prefilter import PreFilter
+from wiki import WikiRenderer, build_project_index, merge_projects, parse_wiki_tables
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -33,6 +46,41 @@ WIKI_POST_ID = int(os.environ.get("WIKI_POST_ID", "0"))  # Set after creating th
 WIKI_TOPIC_ID = int(os.environ.get("WIKI_TOPIC_ID", "0"))
 LISTEN_PORT = int(os.environ.get("TRACKER_PORT", "9100"))
 CONFIDENCE_THRESHOLD = 0.7
+DISCOURSE_POOL_SIZE = int(os.environ.get("DISCOURSE_POOL_SIZE", "4"))
+DISCOURSE_MAX_RETRIES = int(os.environ.get("DISCOURSE_MAX_RETRIES", "4"))
+
+# Webhook intake: the handler only verifies and enqueues; workers do the slow part
+WORKER_COUNT = int(os.environ.get("TRACKER_WORKERS", "2"))
+QUEUE_SIZE = int(os.environ.get("TRACKER_QUEUE_SIZE", "200"))
+# Posts arriving while the queue is full wait here on disk instead of being rejected
+OVERFLOW_DIR = os.environ.get("TRACKER_OVERFLOW_DIR", "tracker-overflow")
+DRAIN_TIMEOUT = float(os.environ.get("TRACKER_DRAIN_TIMEOUT", "60"))
+
+# Wiki writes are coalesced: wait for a quiet period, but never longer than the max
+WIKI_FLUSH_DELAY = float(os.environ.get("WIKI_FLUSH_DELAY", "5"))
+WIKI_FLUSH_MAX_DELAY = float(os.environ.get("WIKI_FLUSH_MAX_DELAY", "30"))
+WIKI_FLUSH_RETRIES = 3
+
+# Optional micro-batching: posts arriving within the window share one Claude call.
+# 0 disables it. Grouping is "mixed" (any members in one call) or "member".
+EXTRACTION_BATCH_WINDOW = float(os.environ.get("EXTRACTION_BATCH_WINDOW", "0"))
+EXTRACTION_BATCH_MAX_WAIT = float(os.environ.get("EXTRACTION_BATCH_MAX_WAIT", "15"))
+EXTRACTION_BATCH_MAX_POSTS = int(os.environ.get("EXTRACTION_BATCH_MAX_POSTS", "10"))
+EXTRACTION_BATCH_GROUPING = os.environ.get("EXTRACTION_BATCH_GROUPING", "mixed")
+
+# Local pre-filter: "shadow" logs what it would skip, "enforce" skips, "off" disables
+PREFILTER_MODE = os.environ.get("PREFILTER_MODE", "shadow")
+PREFILTER_THRESHOLD = float(os.environ.get("PREFILTER_THRESHOLD", "1.0"))
+
+# Parsed copy of the wiki post, persisted so restarts skip the initial fetch
+WIKI_STATE_PATH = os.environ.get("WIKI_STATE_PATH", "wiki-state.json")
+WIKI_CONFLICT_RETRIES = 3
+
+# Extraction results are cached by post content (backfill.py uses the same file)
+EXTRACTION_CACHE_PATH = os.environ.get("EXTRACTION_CACHE_PATH", "extraction-cache.sqlite3")
+EXTRACTION_CACHE_TTL_DAYS = float(os.environ.get("EXTRACTION_CACHE_TTL_DAYS", "90"))
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.environ.get("EXTRACTION_CACHE_MAX_ENTRIES", "50000"))
+LLM_STATS_PATH = os.environ.get("LLM_STATS_PATH", "llm-stats.json")
 
 ANTHROPIC_API_KEY = os.environ["ANTHROPIC_API_KEY"]
 
@@ -43,46 +91,132 @@ logging.basicConfig(
 )
 log = logging.getLogger("project-tracker")
 
+# ---------------------------------------------------------------------------
+# Metrics (served at GET /metrics)
+# ---------------------------------------------------------------------------
+
+metrics = MetricsRegistry()
+QUEUE_WAIT = metrics.histogram(
+    "tracker_queue_wait_seconds", "Time a webhook spent queued before a worker picked it up")
+PROCESS_SECONDS = metrics.histogram(
+    "tracker_process_post_seconds", "Time in process_post, per post that reached a worker")
+STAGE_SECONDS = metrics.histogram(
+    "tracker_stage_seconds",
+    "Time per pipeline stage (extract, wiki_get, parse, merge, render, wiki_put, reply)",
+    ("stage",))
+POSTS = metrics.counter(
+    "tracker_posts_total", "Posts by outcome (processed, skipped, error, failed, rejected)",
+    ("outcome", "reason"))
+PROJECTS_ADDED = metrics.counter("tracker_projects_added_total", "Projects added to the wiki")
+WIKI_WRITES = metrics.counter(
+    "tracker_wiki_writes_total", "Wiki write attempts by result (ok, conflict, error)", ("result",))
+
 # ---------------------------------------------------------------------------
 # Discourse API helpers
 # ---------------------------------------------------------------------------
 
-DISCOURSE_HEADERS = {
-    "Api-Key": DISCOURSE_API_KEY,
-    "Api-Username": DISCOURSE_API_USERNAME,
-    "Content-Type": "application/json",
-}
+discourse = DiscourseClient(
+    DISCOURSE_URL,
+    DISCOURSE_API_KEY,
+    DISCOURSE_API_USERNAME,
+    pool_size=DISCOURSE_POOL_SIZE,
+    max_retries=DISCOURSE_MAX_RETRIES,
+)
 
 
 def discourse_get(path: str) -> dict:
     """GET from Discourse API."""
-    resp = requests.get(f"{DISCOURSE_URL}{path}", headers=DISCOURSE_HEADERS, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    return discourse.get(path)
 
 
 def discourse_put(path: str, data: dict) -> dict:
     """PUT to Discourse API."""
-    resp = requests.put(
-        f"{DISCOURSE_URL}{path}",
-        headers=DISCOURSE_HEADERS,
-        json=data,
-        timeout=30,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return discourse.put(path, data)
 
 
 def discourse_post(path: str, data: dict) -> dict:
     """POST to Discourse API."""
-    resp = requests.post(
-        f"{DISCOURSE_URL}{path}",
-        headers=DISCOURSE_HEADERS,
-        json=data,
-        timeout=30,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return discourse.post(path, data)
+
+
+# ---------------------------------------------------------------------------
+# Coalescing
+# ---------------------------------------------------------------------------
+
+
+class Coalescer(abc.ABC):
+    """Background thread that batches submitted items and flushes them together.
+
+    Items accumulate until none has arrived for ``delay`` seconds, the oldest
+    has waited ``max_delay`` seconds, or ``max_items`` are pending (0 means no
+    limit). Subclasses implement ``flush``, which runs on the coalescer's own
+    thread, so flushes never overlap.
+    """
+
+    def __init__(self, name: str, delay: float, max_delay: float, max_items: int = 0):
+        self.name = name
+        self.delay = delay
+        self.max_delay = max_delay
+        self.max_items = max_items
+        self._cond = threading.Condition()
+        self._pending: list = []
+        self._first_at = 0.0
+        self._last_at = 0.0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def submit(self, item) -> None:
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_at = now
+            self._last_at = now
+            self._pending.append(item)
+            self._cond.notify()
+
+    def requeue(self, items: list) -> None:
+        """Put items back at the front; they flush again after the normal delay."""
+        with self._cond:
+            self._pending = items + self._pending
+            self._first_at = self._last_at = time.monotonic()
+
+    def stop(self, timeout: float) -> None:
+        """Flush anything pending immediately and stop the thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            log.warning("%s still busy after %.0fs — pending work may be lost", self.name, timeout)
+
+    @abc.abstractmethod
+    def flush(self, items: list) -> None:
+        """Handle one batch of submitted items."""
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending:
+                        due = min(self._last_at + self.delay, self._first_at + self.max_delay)
+                        remaining = due - time.monotonic()
+                        full = self.max_items and len(self._pending) >= self.max_items
+                        if self._stopping or full or remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    elif self._stopping:
+                        return
+                    else:
+                        self._cond.wait()
+                take = self.max_items or len(self._pending)
+                items, self._pending = self._pending[:take], self._pending[take:]
+            try:
+                self.flush(items)
+            except Exception:
+                log.exception("%s flush failed", self.name)
 
 
 # ---------------------------------------------------------------------------
@@ -130,18 +264,49 @@ Only include projects with confidence >= 0.7. Be conservative — a casual
 mention of "I tried X" with no detail is low confidence.
 """
 
-client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+EXTRACTION_MODEL = "claude-haiku-4-5-20251001"
 
+client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+extraction_cache = ExtractionCache(
+    EXTRACTION_CACHE_PATH,
+    ttl_seconds=EXTRACTION_CACHE_TTL_DAYS * 86400,
+    max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+)
+usage_tracker = UsageTracker(LLM_STATS_PATH)
+prefilter = PreFilter(PREFILTER_THRESHOLD, PREFILTER_MODE)
+
+
+def extract_projects(post_content: str, member_username: str) -> list[dict] | None:
+    """Extract project mentions from a post using Claude (or the extraction cache).
+
+    Returns None if Claude's reply couldn't be parsed.
+    """
+    cache_key = ExtractionCache.key(post_content, member_username, EXTRACTION_PROMPT, EXTRACTION_MODEL)
+    projects = extraction_cache.get(cache_key)
+    if projects is not None:
+        log.info("Extraction cache hit for @%s (%d hits / %d misses)",
+                 member_username, extraction_cache.hits, extraction_cache.misses)
+    else:
+        with STAGE_SECONDS.time(stage="extract"):
+            projects = call_extraction(post_content, member_username)
+        if projects is None:
+            return None
+        extraction_cache.put(cache_key, projects)
 
-def sanitize_field(s: str) -> str:
-    """Strip pipe characters from text fields to prevent Discourse markdown table corruption."""
-    return s.replace("|", "-").strip()
+    # Filter by confidence threshold and attach member
+    return [
+        {**p, "member": member_username}
+        for p in projects
+        if p.get("confidence", 0) >= CONFIDENCE_THRESHOLD
+    ]
 
 
-def extract_projects(post_content: str, member_username: str) -> list[dict]:
-    """Extract project mentions from a post using Claude."""
-    message = client.messages.create(
-        model="claude-haiku-4-5-20251001",
+def call_extraction(post_content: str, member_username: str) -> list[dict] | None:
+    """Ask Claude for the projects in a post. Returns None if the reply isn't valid JSON."""
+    message = usage_tracker.create(
+        client,
+        "single",
+        model=EXTRACTION_MODEL,
         max_tokens=1024,
         messages=[
             {
@@ -165,241 +330,327 @@ def extract_projects(post_content: str, member_username: str) -> list[dict]:
         result = json.loads(text)
     except json.JSONDecodeError:
         log.warning("Failed to parse Claude response as JSON: %s", text[:200])
-        return []
+        return None
 
-    projects = result.get("projects", [])
-    # Filter by confidence threshold and attach member
-    return [
-        {**p, "member": member_username}
-        for p in projects
-        if p.get("confidence", 0) >= CONFIDENCE_THRESHOLD
-    ]
+    return result.get("projects", [])
 
 
-# ---------------------------------------------------------------------------
-# Wiki post parsing and updating
-# ---------------------------------------------------------------------------
+MULTI_POST_EXTRACTION_PROMPT = """\
+You are analyzing several Discourse community posts, possibly by different
+members, to extract project mentions. The community is a small, private group
+of retired entrepreneurs and coders who build things with AI (primarily Claude).
 
-TIER_HEADERS = {
-    "products_and_tools": "## Products & Tools",
-    "active_experiments": "## Active Experiments",
-    "explorations": "## Explorations",
-}
+Each post is numbered and labeled with its author. A "project" is something
+a post's AUTHOR is building, has built, or is experimenting with. It must be
+that author's own work — not a tool they're merely using or reviewing, and
+not another member's project. Never attribute a project to anyone other than
+the author of the post(s) it comes from.
 
-TABLE_ROW_RE = re.compile(
-    r"^\|\s*(?P<project>[^|]+?)\s*\|\s*(?P<member>[^|]+?)\s*\|\s*"
-    r"(?P<description>[^|]+?)\s*\|\s*(?P<links>[^|]*?)\s*\|$"
-)
+Classify each project into one of three tiers:
+- products_and_tools: Shipped, named, has users or a URL. Signals: "launched",
+  "shipped", "users are using", "available at".
+- active_experiments: Actively being built or prototyped. Signals: "building",
+  "working on", "prototype", "automating".
+- explorations: Early-stage ideas, one-off tries. Signals: "playing with",
+  "thinking about", "tried", "noodling on".
 
+If a post includes a URL for the project (website, GitHub repo, App Store
+link, etc.), include it in the "url" field. Only include URLs that belong to
+the project itself — not links to articles, documentation, or other people's
+projects. Prefer the primary/canonical URL (product website > GitHub > App Store).
 
-def parse_wiki_tables(content: str) -> dict[str, list[dict]]:
-    """Parse the wiki post markdown into structured data per tier."""
-    tiers: dict[str, list[dict]] = {
-        "products_and_tools": [],
-        "active_experiments": [],
-        "explorations": [],
+Return a JSON object with this exact structure:
+{
+  "projects": [
+    {
+      "name": "ProjectName",
+      "description": "One-sentence description of what it does",
+      "tier": "products_and_tools|active_experiments|explorations",
+      "confidence": 0.0-1.0,
+      "url": "https://example.com or null if no URL found",
+      "source_posts": [0, 2]
     }
+  ]
+}
 
-    current_tier = None
-    for line in content.split("\n"):
-        stripped = line.strip()
-
-        # Detect tier headers
-        if stripped == "## Products & Tools":
-            current_tier = "products_and_tools"
-            continue
-        elif stripped == "## Active Experiments":
-            current_tier = "active_experiments"
-            continue
-        elif stripped == "## Explorations":
-            current_tier = "explorations"
-            continue
-        elif stripped.startswith("## ") or stripped.startswith("# "):
-            current_tier = None
-            continue
-
-        if current_tier is None:
-            continue
-
-        # Parse table rows (skip header and separator)
-        match = TABLE_ROW_RE.match(stripped)
-        if match and match.group("project").strip() not in ("Project", "[Project]"):
-            proj_cell = match.group("project").strip()
-            proj_name, proj_url = parse_project_cell(proj_cell)
-            tiers[current_tier].append({
-                "project": proj_name,
-                "url": proj_url,
-                "member": match.group("member").strip(),
-                "description": match.group("description").strip(),
-                "links": match.group("links").strip(),
-            })
-
-    return tiers
-
-
-PROJECT_LINK_RE = re.compile(r"^\[([^\]]+)\]\(([^)]+)\)$")
-
-
-def parse_project_cell(cell: str) -> tuple[str, str]:
-    """Parse a project cell, returning (name, url). URL is empty if plain text."""
-    match = PROJECT_LINK_RE.match(cell.strip())
-    if match:
-        return match.group(1), match.group(2)
-    return cell.strip(), ""
-
-
-def render_project_cell(name: str, url: str) -> str:
-    """Render a project name, optionally as a markdown link."""
-    if url:
-        return f"[{name}]({url})"
-    return name
-
-
-def normalize_name(name: str) -> str:
-    """Normalize a project name for dedup comparison."""
-    return re.sub(r"[^a-z0-9]", "", name.lower())
-
-
-def merge_projects(
-    existing: dict[str, list[dict]],
-    new_projects: list[dict],
-    post_url: str,
-) -> tuple[dict[str, list[dict]], list[dict]]:
-    """Merge new projects into existing tiers. Returns (merged, added)."""
-    added = []
-
-    for proj in new_projects:
-        tier = proj["tier"]
-        name_norm = normalize_name(proj["name"])
-        member = f"@{proj['member']}" if not proj["member"].startswith("@") else proj["member"]
-
-        proj_url = proj.get("url") or ""
-        if proj_url == "null":
-            proj_url = ""
-
-        # Check for existing entry (same project + member)
-        found = False
-        for entry in existing.get(tier, []):
-            entry_member = entry["member"].lstrip("@")
-            proj_member = proj["member"].lstrip("@")
-            if normalize_name(entry["project"]) == name_norm and entry_member == proj_member:
-                # Update description if new one is longer (more detailed)
-                if len(proj["description"]) > len(entry["description"]):
-                    entry["description"] = sanitize_field(proj["description"])
-                # Add project URL if we don't have one yet
-                if proj_url and not entry.get("url"):
-                    entry["url"] = proj_url
-                # Append link if not already present
-                if post_url and post_url not in entry["links"]:
-                    if entry["links"]:
-                        entry["links"] += f", [Post]({post_url})"
-                    else:
-                        entry["links"] = f"[Post]({post_url})"
-                found = True
-                break
+"source_posts" lists the numbers of the posts that mention the project; they
+must all be by the same author. If there are no project mentions, return:
+{"projects": []}
 
-        # Also check other tiers (project might have been promoted)
-        if not found:
-            for other_tier, entries in existing.items():
-                if other_tier == tier:
-                    continue
-                for entry in entries:
-                    entry_member = entry["member"].lstrip("@")
-                    proj_member = proj["member"].lstrip("@")
-                    if normalize_name(entry["project"]) == name_norm and entry_member == proj_member:
-                        found = True
-                        # Don't change tier — that's a member decision
-                        if proj_url and not entry.get("url"):
-                            entry["url"] = proj_url
-                        if post_url and post_url not in entry["links"]:
-                            if entry["links"]:
-                                entry["links"] += f", [Post]({post_url})"
-                            else:
-                                entry["links"] = f"[Post]({post_url})"
-                        break
-                if found:
-                    break
-
-        if not found:
-            existing.setdefault(tier, []).append({
-                "project": sanitize_field(proj["name"]),
-                "url": proj_url,
-                "member": member,
-                "description": sanitize_field(proj["description"]),
-                "links": f"[Post]({post_url})" if post_url else "",
-            })
-            added.append(proj)
-
-    return existing, added
-
-
-def render_wiki_post(tiers: dict[str, list[dict]]) -> str:
-    """Render structured tier data back into wiki post markdown."""
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-
-    sections = []
-    sections.append("# Community Project Directory\n")
-    sections.append(
-        "A living list of what AIC members are building. This post is a wiki — "
-        "edit it directly to add or update your projects. The list is also "
-        "updated automatically when you mention projects in your posts.\n"
-    )
+Only include projects with confidence >= 0.7. Be conservative — a casual
+mention of "I tried X" with no detail is low confidence.
+"""
 
-    tier_config = [
-        ("products_and_tools", "Products & Tools", "Projects that are shipped, named, and available for use."),
-        ("active_experiments", "Active Experiments", "Things actively being built or prototyped."),
-        ("explorations", "Explorations", "Early-stage ideas and one-off experiments."),
-    ]
 
-    for tier_key, tier_title, tier_desc in tier_config:
-        sections.append(f"## {tier_title}")
-        sections.append(f"{tier_desc}\n")
-        sections.append("| Project | Member | Description | Links |")
-        sections.append("|---------|--------|-------------|-------|")
-        for entry in tiers.get(tier_key, []):
-            proj_cell = render_project_cell(entry["project"], entry.get("url", ""))
-            sections.append(
-                f"| {proj_cell} | {entry['member']} | "
-                f"{entry['description']} | {entry['links']} |"
+def extract_projects_multi(posts: list[dict]) -> dict:
+    """Extract projects from several posts in one call. Returns {post id: projects}.
+
+    Each post dict has id, username and raw. Results are cached per post, so
+    only posts without a cached extraction are sent to Claude. A post maps to
+    None if Claude's reply couldn't be parsed.
+    """
+    results: dict = {}
+    misses = []
+    for post in posts:
+        cache_key = ExtractionCache.key(
+            post["raw"], post["username"], MULTI_POST_EXTRACTION_PROMPT, EXTRACTION_MODEL
+        )
+        cached = extraction_cache.get(cache_key)
+        if cached is None:
+            misses.append((post, cache_key))
+        else:
+            results[post["id"]] = cached
+
+    if misses:
+        post_texts = [
+            f"--- Post {i} by @{post['username']} ---\n{post['raw']}"
+            for i, (post, _) in enumerate(misses)
+        ]
+        with STAGE_SECONDS.time(stage="extract"):
+            message = usage_tracker.create(
+                client,
+                "multi",
+                model=EXTRACTION_MODEL,
+                max_tokens=2048,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": (
+                            f"{len(misses)} posts:\n\n" + "\n\n".join(post_texts) + "\n\n"
+                            "Extract any project mentions from these posts."
+                        ),
+                    }
+                ],
+                system=MULTI_POST_EXTRACTION_PROMPT,
             )
-        sections.append("")
 
-    sections.append("---")
-    sections.append(f"*Last automated update: {now}*")
+        text = message.content[0].text
+        json_match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
+        if json_match:
+            text = json_match.group(1)
 
-    return "\n".join(sections)
+        try:
+            result = json.loads(text)
+        except json.JSONDecodeError:
+            log.warning("Failed to parse batched Claude response as JSON: %s", text[:200])
+            result = None
+
+        if result is not None:
+            # Fan results back out to the post(s) each project came from
+            per_post: list[list[dict]] = [[] for _ in misses]
+            for p in result.get("projects", []):
+                source_posts = {
+                    idx for idx in p.get("source_posts", [])
+                    if isinstance(idx, int) and 0 <= idx < len(misses)
+                }
+                project = {k: v for k, v in p.items() if k != "source_posts"}
+                for idx in sorted(source_posts):
+                    per_post[idx].append(project)
+            for (post, cache_key), projects in zip(misses, per_post):
+                extraction_cache.put(cache_key, projects)
+                results[post["id"]] = projects
+
+    # Filter by confidence threshold and attach each post's author
+    return {
+        post["id"]: [
+            {**p, "member": post["username"]}
+            for p in results[post["id"]]
+            if p.get("confidence", 0) >= CONFIDENCE_THRESHOLD
+        ] if post["id"] in results else None
+        for post in posts
+    }
 
 
-def update_wiki_post(new_projects: list[dict], post_url: str) -> list[dict]:
-    """Read the wiki post, merge new projects, write it back. Returns added projects."""
-    if not WIKI_POST_ID:
-        log.error("WIKI_POST_ID not set — cannot update wiki post")
-        return []
+class ExtractionBatcher(Coalescer):
+    """Groups posts that arrive close together into shared extraction calls."""
+
+    def __init__(self, delay: float, max_delay: float, max_posts: int, grouping: str):
+        super().__init__("extraction-batcher", delay, max_delay, max_posts)
+        self.grouping = grouping
+
+    def flush(self, posts: list[dict]) -> None:
+        # A post edited within the window is queued again; only its latest text is extracted
+        latest = {post["id"]: post for post in posts}
+        if len(latest) < len(posts):
+            log.info("Dropped %d superseded queued version(s) of the same post(s)",
+                     len(posts) - len(latest))
+        posts = list(latest.values())
+
+        if self.grouping == "member":
+            groups: dict[str, list[dict]] = {}
+            for post in posts:
+                groups.setdefault(post["username"], []).append(post)
+            batches = list(groups.values())
+        else:
+            batches = [posts]
+
+        for batch in batches:
+            log.info("Extracting %d post(s) in one call: %s",
+                     len(batch), ", ".join(str(p["id"]) for p in batch))
+            try:
+                by_post = extract_projects_multi(batch)
+            except Exception:
+                log.exception("Batched extraction failed for %d post(s)", len(batch))
+                POSTS.inc(len(batch), outcome="failed", reason="exception")
+                continue
+            for post in batch:
+                submit_projects(post["id"], by_post[post["id"]], post["url"], post["prefilter_score"])
+
+
+extraction_batcher = (
+    ExtractionBatcher(
+        EXTRACTION_BATCH_WINDOW,
+        EXTRACTION_BATCH_MAX_WAIT,
+        EXTRACTION_BATCH_MAX_POSTS,
+        EXTRACTION_BATCH_GROUPING,
+    )
+    if EXTRACTION_BATCH_WINDOW > 0
+    else None
+)
 
-    # Fetch current wiki content
-    post_data = discourse_get(f"/posts/{WIKI_POST_ID}.json")
-    current_content = post_data.get("raw", "")
 
-    # Parse, merge, render
-    existing = parse_wiki_tables(current_content)
-    merged, added = merge_projects(existing, new_projects, post_url)
+# ---------------------------------------------------------------------------
+# Wiki post updating
+# ---------------------------------------------------------------------------
 
-    if not added:
-        log.info("No new projects to add")
+class WikiState:
+    """Local parsed copy of the wiki post, keyed by its Discourse post version.
+
+    The copy is only re-fetched when it is marked stale — at startup without
+    a snapshot, when a webhook reports a newer version of the wiki post (a
+    member edited it by hand), or when a PUT is rejected as an edit conflict.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version: int | None = None
+        self.raw = ""
+        self.tiers: dict[str, list[dict]] = {}
+        self.stale = True
+        self._lock = threading.Lock()
+
+    def load_snapshot(self) -> None:
+        """Restore the last known wiki state from disk, if there is one."""
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning("Ignoring unreadable wiki snapshot %s: %s", self.path, e)
+            return
+        self.version = snapshot.get("version")
+        self.raw = snapshot.get("raw", "")
+        self.tiers = snapshot.get("tiers") or parse_wiki_tables(self.raw)
+        self.stale = False
+        log.info("Loaded wiki snapshot (version %s)", self.version)
+
+    def save_snapshot(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": self.version, "raw": self.raw, "tiers": self.tiers}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.warning("Could not write wiki snapshot %s: %s", self.path, e)
+
+    def note_version(self, version: int | None) -> None:
+        """Mark the copy stale if Discourse has a newer version than we do."""
+        with self._lock:
+            if version is not None and (self.version is None or version > self.version):
+                log.info("Wiki post is at version %s (ours: %s) — will re-fetch",
+                         version, self.version)
+                self.stale = True
+
+    def refresh(self) -> None:
+        """Fetch and parse the current wiki post."""
+        with STAGE_SECONDS.time(stage="wiki_get"):
+            post_data = discourse_get(f"/posts/{WIKI_POST_ID}.json")
+        self.set(post_data.get("raw", ""), post_data.get("version"))
+
+    def set(self, raw: str, version: int | None, tiers: dict[str, list[dict]] | None = None) -> None:
+        if tiers is None:
+            with STAGE_SECONDS.time(stage="parse"):
+                tiers = parse_wiki_tables(raw)
+        with self._lock:
+            self.raw = raw
+            self.version = version
+            self.tiers = tiers
+            self.stale = False
+        self.save_snapshot()
+
+    def copy_tiers(self) -> dict[str, list[dict]]:
+        """Copy of the tiers that merge_projects can mutate freely."""
+        return {tier: [dict(entry) for entry in entries] for tier, entries in self.tiers.items()}
+
+
+wiki_state = WikiState(WIKI_STATE_PATH)
+# Only used by the wiki batcher's thread
+wiki_renderer = WikiRenderer()
+
+
+def update_wiki_post(batches: list[tuple[list[dict], str]]) -> list[dict]:
+    """Merge every (projects, post_url) batch into the wiki post and write it back once.
+
+    Works from the local WikiState instead of re-fetching. The PUT carries
+    the raw text we merged against, so Discourse rejects it with a 409 if
+    someone edited the wiki in between; we then re-fetch and re-merge rather
+    than overwrite their edit.
+
+    Returns the added projects, each tagged with the post_url it came from.
+    """
+    if not WIKI_POST_ID:
+        log.error("WIKI_POST_ID not set — cannot update wiki post")
         return []
 
-    new_content = render_wiki_post(merged)
+    for _ in range(WIKI_CONFLICT_RETRIES):
+        if wiki_state.stale:
+            wiki_state.refresh()
 
-    # Update the wiki post
-    discourse_put(f"/posts/{WIKI_POST_ID}.json", {
-        "post": {"raw": new_content},
-    })
-    log.info("Updated wiki post with %d new project(s)", len(added))
+        # Merge into a copy so a rejected PUT leaves the local state untouched
+        with STAGE_SECONDS.time(stage="merge"):
+            merged = wiki_state.copy_tiers()
+            index = build_project_index(merged)
+            added = []
+            for new_projects, post_url in batches:
+                merged, batch_added = merge_projects(merged, new_projects, post_url, index)
+                added.extend({**p, "post_url": post_url} for p in batch_added)
 
-    return added
+        if not added:
+            log.info("No new projects to add")
+            return []
 
+        with STAGE_SECONDS.time(stage="render"):
+            new_content = wiki_renderer.render(merged)
 
-def post_update_reply(added: list[dict], post_url: str) -> None:
+        # Update the wiki post
+        try:
+            with STAGE_SECONDS.time(stage="wiki_put"):
+                result = discourse_put(f"/posts/{WIKI_POST_ID}.json", {
+                    "post": {"raw": new_content, "raw_old": wiki_state.raw},
+                })
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 409:
+                WIKI_WRITES.inc(result="conflict")
+                log.info("Wiki post changed since version %s — re-fetching and re-merging",
+                         wiki_state.version)
+                wiki_state.stale = True
+                continue
+            WIKI_WRITES.inc(result="error")
+            raise
+
+        WIKI_WRITES.inc(result="ok")
+        PROJECTS_ADDED.inc(len(added))
+        updated = result.get("post", {})
+        wiki_state.set(updated.get("raw", new_content), updated.get("version"), merged)
+        log.info("Updated wiki post to version %s with %d new project(s) from %d post(s)",
+                 wiki_state.version, len(added), len(batches))
+        return added
+
+    raise RuntimeError(f"Wiki post kept changing after {WIKI_CONFLICT_RETRIES} merge attempts")
+
+
+def post_update_reply(added: list[dict]) -> None:
     """Post a reply to the wiki topic summarizing what was added."""
     if not WIKI_TOPIC_ID or not added:
         return
@@ -413,18 +664,56 @@ def post_update_reply(added: list[dict], post_url: str) -> None:
         }.get(proj["tier"], proj["tier"])
         lines.append(
             f"- Added **{proj['name']}** by @{proj['member']} "
-            f"to {tier_label} ([source]({post_url}))"
+            f"to {tier_label} ([source]({proj['post_url']}))"
         )
 
     reply_text = "**Auto-update:**\n" + "\n".join(lines)
 
-    discourse_post("/posts.json", {
-        "topic_id": WIKI_TOPIC_ID,
-        "raw": reply_text,
-    })
+    with STAGE_SECONDS.time(stage="reply"):
+        discourse_post("/posts.json", {
+            "topic_id": WIKI_TOPIC_ID,
+            "raw": reply_text,
+        })
     log.info("Posted update reply to topic %d", WIKI_TOPIC_ID)
 
 
+class WikiWriter(Coalescer):
+    """Coalesces extracted projects into one wiki read-modify-write.
+
+    Each item is a (projects, post_url) pair from one post. A burst of posts
+    becomes a single merge and PUT, and a single auto-update reply. Being
+    the only writer also means two bursts can no longer overwrite each
+    other's merge.
+    """
+
+    def __init__(self, delay: float, max_delay: float):
+        super().__init__("wiki-writer", delay, max_delay)
+        self._failures = 0
+
+    def flush(self, batches: list[tuple[list[dict], str]]) -> None:
+        try:
+            added = update_wiki_post(batches)
+        except Exception:
+            self._failures += 1
+            if self._failures >= WIKI_FLUSH_RETRIES:
+                log.exception("Wiki update failed %d times — dropping %d post(s)",
+                              self._failures, len(batches))
+                self._failures = 0
+                return
+            log.exception("Wiki update failed (attempt %d) — will retry", self._failures)
+            self.requeue(batches)
+            return
+
+        self._failures = 0
+        try:
+            post_update_reply(added)
+        except Exception:
+            log.exception("Failed to post update reply")
+
+
+wiki_writer = WikiWriter(WIKI_FLUSH_DELAY, WIKI_FLUSH_MAX_DELAY)
+
+
 # ---------------------------------------------------------------------------
 # Webhook handler
 # ---------------------------------------------------------------------------
@@ -446,7 +735,24 @@ def verify_webhook(body: bytes, signature: str) -> bool:
 
 
 class WebhookHandler(BaseHTTPRequestHandler):
-    """HTTP handler for Discourse webhook events."""
+    """HTTP handler for Discourse webhook events.
+
+    Only verifies and enqueues — extraction and wiki updates happen on the
+    worker pool so a slow Claude call never delays the next delivery.
+    """
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def do_POST(self):
         if self.path != "/webhook":
@@ -465,52 +771,246 @@ class WebhookHandler(BaseHTTPRequestHandler):
             self.end_headers()
             return
 
-        # Respond immediately so Discourse doesn't retry
-        self.send_response(200)
-        self.end_headers()
-
-        # Process the webhook
         event_type = self.headers.get("X-Discourse-Event", "")
         if event_type not in ("post_created", "post_edited"):
             log.debug("Ignoring event type: %s", event_type)
+            self.send_response(200)
+            self.end_headers()
             return
 
         try:
             payload = json.loads(body)
         except json.JSONDecodeError:
             log.warning("Invalid JSON in webhook body")
+            self.send_response(200)
+            self.end_headers()
             return
 
         post = payload.get("post", {})
-        process_post(post)
+        try:
+            post_queue.put_nowait((time.monotonic(), post))
+        except queue.Full:
+            # Discourse only redelivers a failed webhook if retry_web_hook_events
+            # is enabled, so park the post on disk rather than answering 503
+            try:
+                overflow.spill(post)
+            except OSError:
+                log.exception("Work queue full (%d) and could not spill post %s — rejecting it",
+                              QUEUE_SIZE, post.get("id"))
+                POSTS.inc(outcome="rejected", reason="queue_full")
+                self.send_response(503)
+                self.send_header("Retry-After", "30")
+                self.end_headers()
+                return
+            log.warning("Work queue full (%d) — spilled post %s to %s",
+                        QUEUE_SIZE, post.get("id"), OVERFLOW_DIR)
+
+        self.send_response(200)
+        self.end_headers()
 
     def log_message(self, format, *args):
         """Suppress default request logging — we use our own logger."""
         pass
 
 
+# ---------------------------------------------------------------------------
+# Worker pool
+# ---------------------------------------------------------------------------
+
+post_queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+
+class OverflowSpool:
+    """Posts that arrived while the work queue was full, one JSON file each.
+
+    A feeder thread moves them back into the queue, oldest first, as workers
+    free up room. Files left behind by a previous run are fed at startup.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._seq = itertools.count()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="overflow-feeder", daemon=True)
+
+    def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread.start()
+
+    def spill(self, post: dict) -> None:
+        """Durably park a post until the queue has room."""
+        name = f"{time.time_ns():020d}-{next(self._seq):06d}-{post.get('id')}.json"
+        tmp_path = os.path.join(self.directory, f".{name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(post, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        self._wake.set()
+
+    def depth(self) -> int:
+        try:
+            return sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+        except FileNotFoundError:
+            return 0
+
+    def stop(self, timeout: float) -> None:
+        """Stop feeding; spilled posts not yet queued stay on disk for the next run."""
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            # Cleared before listing, so a spill from here on wakes the wait below
+            self._wake.clear()
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+            for name in names:
+                if not self._feed(os.path.join(self.directory, name)):
+                    return
+            if not names:
+                self._wake.wait()
+
+    def _feed(self, path: str) -> bool:
+        """Queue one spilled post, waiting for room. False if stopped first."""
+        try:
+            with open(path) as f:
+                post = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning("Dropping unreadable spilled post %s: %s", path, e)
+            os.remove(path)
+            return True
+        while True:
+            if self._stopping.is_set():
+                return False
+            try:
+                post_queue.put((time.monotonic(), post), timeout=1)
+                break
+            except queue.Full:
+                continue
+        os.remove(path)
+        return True
+
+
+overflow = OverflowSpool(OVERFLOW_DIR)
+
+
+def worker_loop() -> None:
+    """Drain the post queue until a None sentinel arrives."""
+    while True:
+        item = post_queue.get()
+        try:
+            if item is None:
+                return
+            enqueued_at, post = item
+            waited = time.monotonic() - enqueued_at
+            QUEUE_WAIT.observe(waited)
+            if waited > 5:
+                log.info("Post %s waited %.1fs in queue", post.get("id"), waited)
+            with PROCESS_SECONDS.time():
+                process_post(post)
+        except Exception:
+            POSTS.inc(outcome="failed", reason="exception")
+            log.exception("Failed to process post")
+        finally:
+            post_queue.task_done()
+
+
+def start_workers(count: int) -> list[threading.Thread]:
+    """Start the worker threads that run process_post."""
+    workers = []
+    for i in range(count):
+        t = threading.Thread(target=worker_loop, name=f"worker-{i}", daemon=True)
+        t.start()
+        workers.append(t)
+    return workers
+
+
+def drain_workers(workers: list[threading.Thread], timeout: float) -> None:
+    """Let queued posts finish, then stop the workers."""
+    pending = post_queue.qsize()
+    if pending:
+        log.info("Draining %d queued post(s)...", pending)
+    # Sentinels go in behind any queued work, so everything ahead of them runs first
+    for _ in workers:
+        post_queue.put(None)
+    deadline = time.monotonic() + timeout
+    for t in workers:
+        t.join(max(0.0, deadline - time.monotonic()))
+    stuck = sum(1 for t in workers if t.is_alive())
+    if stuck:
+        log.warning("%d worker(s) still busy after %.0fs drain timeout", stuck, timeout)
+
+
 def process_post(post: dict) -> None:
     """Process a single Discourse post for project mentions."""
     post_id = post.get("id")
     topic_id = post.get("topic_id")
     username = post.get("username", "")
-    raw = post.get("raw", "") or post.get("cooked", "")
+    # Raw markdown (or cooked HTML as text) minus quotes, images and oneboxes
+    text = post_text(post)
+
+    # Edits to the wiki post itself (by hand or by us) tell us its latest version
+    if post_id == WIKI_POST_ID:
+        wiki_state.note_version(post.get("version"))
+        POSTS.inc(outcome="skipped", reason="wiki_post")
+        return
 
     # Skip: system posts, our own updates, posts in the wiki topic itself
     if username in ("system", DISCOURSE_API_USERNAME):
         log.debug("Skipping post by %s", username)
+        POSTS.inc(outcome="skipped", reason="system_user")
         return
     if topic_id == WIKI_TOPIC_ID:
         log.debug("Skipping post in wiki topic")
+        POSTS.inc(outcome="skipped", reason="wiki_topic")
         return
-    if not raw or len(raw) < 20:
+    if len(text) < 20:
         log.debug("Skipping short/empty post %s", post_id)
+        POSTS.inc(outcome="skipped", reason="too_short")
+        return
+
+    # Most posts are conversational; don't pay for a Claude call without a project signal
+    extract, prefilter_score = prefilter.should_extract(post_id, text)
+    if not extract:
+        POSTS.inc(outcome="skipped", reason="prefilter")
         return
 
     log.info("Processing post %s by @%s in topic %s", post_id, username, topic_id)
 
+    # Build post URL
+    post_url = f"{DISCOURSE_URL}/t/{topic_id}/{post.get('post_number', '')}"
+
+    if extraction_batcher is not None:
+        extraction_batcher.submit({
+            "id": post_id,
+            "username": username,
+            "raw": text,
+            "url": post_url,
+            "prefilter_score": prefilter_score,
+        })
+        return
+
     # Extract projects
-    projects = extract_projects(raw, username)
+    projects = extract_projects(text, username)
+    submit_projects(post_id, projects, post_url, prefilter_score)
+
+
+def submit_projects(
+    post_id, projects: list[dict] | None, post_url: str, prefilter_score: float | None
+) -> None:
+    """Hand a post's projects to the coalescing writer, which updates the wiki and replies.
+
+    ``projects`` is None when the extraction failed; that post is neither
+    processed nor a recall sample for the pre-filter.
+    """
+    if projects is None:
+        log.warning("Extraction failed for post %s; not updating the wiki", post_id)
+        POSTS.inc(outcome="error", reason="parse_error")
+        return
+    prefilter.record_result(post_id, prefilter_score, len(projects))
+    POSTS.inc(outcome="processed", reason="projects" if projects else "no_projects")
     if not projects:
         log.info("No project mentions found in post %s", post_id)
         return
@@ -519,12 +1019,39 @@ def process_post(post: dict) -> None:
              len(projects), post_id,
              ", ".join(p["name"] for p in projects))
 
-    # Build post URL
-    post_url = f"{DISCOURSE_URL}/t/{topic_id}/{post.get('post_number', '')}"
+    wiki_writer.submit((projects, post_url))
 
-    # Update wiki and post reply
-    added = update_wiki_post(projects, post_url)
-    post_update_reply(added, post_url)
+
+def collect_runtime_metrics() -> list:
+    """Export queue depth, cache, Claude and Discourse call stats at scrape time."""
+    cache = extraction_cache.stats()
+    claude = usage_tracker.summary()
+    calls = discourse.timings()
+    return [
+        ("tracker_queue_depth", "gauge", "Webhooks waiting for a worker",
+         [({}, post_queue.qsize())]),
+        ("tracker_overflow_depth", "gauge", "Webhooks spilled to disk while the queue was full",
+         [({}, overflow.depth())]),
+        ("tracker_extraction_cache_lookups_total", "counter", "Extraction cache lookups by result",
+         [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]),
+        ("tracker_claude_calls_total", "counter", "Claude API calls by model/mode",
+         [({"call": name}, stats["calls"]) for name, stats in claude.items()]),
+        ("tracker_claude_errors_total", "counter", "Failed Claude API calls by model/mode",
+         [({"call": name}, stats["errors"]) for name, stats in claude.items()]),
+        ("tracker_claude_tokens_total", "counter", "Claude tokens by model/mode and kind",
+         [({"call": name, "kind": kind}, stats[f"{kind}_tokens"])
+          for name, stats in claude.items()
+          for kind in ("input", "output", "cache_read", "cache_write")]),
+        ("tracker_discourse_requests_total", "counter", "Discourse API requests by endpoint",
+         [({"endpoint": name}, stats["calls"]) for name, stats in calls.items()]),
+        ("tracker_discourse_errors_total", "counter", "Discourse API error responses by endpoint",
+         [({"endpoint": name}, stats["errors"]) for name, stats in calls.items()]),
+        ("tracker_discourse_retries_total", "counter", "Discourse API retries by endpoint",
+         [({"endpoint": name}, stats["retries"]) for name, stats in calls.items()]),
+    ]
+
+
+metrics.add_collector(collect_runtime_metrics)
 
 
 # ---------------------------------------------------------------------------
@@ -539,13 +1066,43 @@ def main():
         )
         sys.exit(1)
 
-    server = HTTPServer(("127.0.0.1", LISTEN_PORT), WebhookHandler)
-    log.info("Project tracker listening on port %d", LISTEN_PORT)
+    wiki_state.load_snapshot()
+    wiki_writer.start()
+    if extraction_batcher is not None:
+        extraction_batcher.start()
+    workers = start_workers(WORKER_COUNT)
+    overflow.start()
+    server = ThreadingHTTPServer(("127.0.0.1", LISTEN_PORT), WebhookHandler)
+
+    # systemd stops us with SIGTERM; shutdown() must run off the serving thread
+    signal.signal(
+        signal.SIGTERM,
+        lambda signum, frame: threading.Thread(target=server.shutdown).start(),
+    )
+
+    log.info("Project tracker listening on port %d (%d workers, queue size %d)",
+             LISTEN_PORT, WORKER_COUNT, QUEUE_SIZE)
+    if extraction_batcher is not None:
+        log.info("Micro-batching extraction: %.1fs window, up to %d posts, %s grouping",
+                 EXTRACTION_BATCH_WINDOW, EXTRACTION_BATCH_MAX_POSTS, EXTRACTION_BATCH_GROUPING)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
-        log.info("Shutting down")
-        server.server_close()
+        pass
+
+    log.info("Shutting down")
+    server.server_close()
+    # Stop feeding first, so nothing is queued behind the workers' stop sentinels
+    overflow.stop(DRAIN_TIMEOUT)
+    drain_workers(workers, DRAIN_TIMEOUT)
+    if extraction_batcher is not None:
+        extraction_batcher.stop(DRAIN_TIMEOUT)
+    wiki_writer.stop(DRAIN_TIMEOUT)
+    log.info("Extraction cache: %s", extraction_cache.stats())
+    log.info("Discourse calls: %s", discourse.timings())
+    log.info("Prefilter: %s", prefilter.stats())
+    usage_tracker.log_summary()
+    usage_tracker.write_stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,377 @@
+"""
+AIC Project Tracker — Wiki post parsing, merging and rendering.
+
+The directory lives in a Discourse wiki post as one markdown table per
+tier. These helpers turn that markdown into structured rows, merge new
+project mentions into them, and render them back. Shared by tracker.py
+and backfill.py.
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+
+def sanitize_field(s: str) -> str:
+    """Strip pipe characters from text fields to prevent Discourse markdown table corruption."""
+    return s.replace("|", "-").strip()
+
+
+TIER_HEADERS = {
+    "products_and_tools": "## Products & Tools",
+    "active_experiments": "## Active Experiments",
+    "explorations": "## Explorations",
+}
+
+TABLE_ROW_RE = re.compile(
+    r"^\|\s*(?P<project>[^|]+?)\s*\|\s*(?P<member>[^|]+?)\s*\|\s*"
+    r"(?P<description>[^|]+?)\s*\|\s*(?P<links>[^|]*?)\s*\|$"
+)
+TABLE_SEPARATOR_RE = re.compile(r"^\|(\s*:?-+:?\s*\|)+$")
+
+
+def parse_wiki_tables(content: str) -> dict[str, list[dict]]:
+    """Parse the wiki post markdown into structured data per tier."""
+    tiers: dict[str, list[dict]] = {
+        "products_and_tools": [],
+        "active_experiments": [],
+        "explorations": [],
+    }
+
+    current_tier = None
+    for line in content.split("\n"):
+        stripped = line.strip()
+
+        # Detect tier headers
+        if stripped == "## Products & Tools":
+            current_tier = "products_and_tools"
+            continue
+        elif stripped == "## Active Experiments":
+            current_tier = "active_experiments"
+            continue
+        elif stripped == "## Explorations":
+            current_tier = "explorations"
+            continue
+        elif stripped.startswith("## ") or stripped.startswith("# "):
+            current_tier = None
+            continue
+
+        if current_tier is None:
+            continue
+
+        # Parse table rows (skip header and separator)
+        if TABLE_SEPARATOR_RE.match(stripped):
+            continue
+        match = TABLE_ROW_RE.match(stripped)
+        if match and match.group("project").strip() not in ("Project", "[Project]"):
+            proj_cell = match.group("project").strip()
+            proj_name, proj_url = parse_project_cell(proj_cell)
+            tiers[current_tier].append({
+                "project": proj_name,
+                "url": proj_url,
+                "member": match.group("member").strip(),
+                "description": match.group("description").strip(),
+                "links": match.group("links").strip(),
+            })
+
+    return tiers
+
+
+PROJECT_LINK_RE = re.compile(r"^\[([^\]]+)\]\(([^)]+)\)$")
+
+
+def parse_project_cell(cell: str) -> tuple[str, str]:
+    """Parse a project cell, returning (name, url). URL is empty if plain text."""
+    match = PROJECT_LINK_RE.match(cell.strip())
+    if match:
+        return match.group(1), match.group(2)
+    return cell.strip(), ""
+
+
+def render_project_cell(name: str, url: str) -> str:
+    """Render a project name, optionally as a markdown link."""
+    if url:
+        return f"[{name}]({url})"
+    return name
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a project name for dedup comparison."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+ProjectIndex = dict[tuple[str, str], dict[str, dict]]
+
+
+def project_key(name: str, member: str) -> tuple[str, str]:
+    """Dedup key for a directory row: normalized project name plus member without @."""
+    return normalize_name(name), member.lstrip("@")
+
+
+def build_project_index(tiers: dict[str, list[dict]]) -> ProjectIndex:
+    """Index every row by project_key, mapping to {tier: first matching entry}."""
+    index: ProjectIndex = {}
+    for tier, entries in tiers.items():
+        for entry in entries:
+            index.setdefault(project_key(entry["project"], entry["member"]), {}).setdefault(tier, entry)
+    return index
+
+
+def append_post_link(entry: dict, post_url: str) -> None:
+    """Add a [Post] link to an entry unless it is already there."""
+    if post_url and post_url not in entry["links"]:
+        if entry["links"]:
+            entry["links"] += f", [Post]({post_url})"
+        else:
+            entry["links"] = f"[Post]({post_url})"
+
+
+def merge_projects(
+    existing: dict[str, list[dict]],
+    new_projects: list[dict],
+    post_url: str,
+    index: ProjectIndex | None = None,
+) -> tuple[dict[str, list[dict]], list[dict]]:
+    """Merge new projects into existing tiers. Returns (merged, added).
+
+    Pass an index from build_project_index to reuse it across several merges
+    into the same tiers; it is kept up to date as projects are added.
+    """
+    if index is None:
+        index = build_project_index(existing)
+    added = []
+
+    for proj in new_projects:
+        tier = proj["tier"]
+        member = f"@{proj['member']}" if not proj["member"].startswith("@") else proj["member"]
+
+        proj_url = proj.get("url") or ""
+        if proj_url == "null":
+            proj_url = ""
+
+        # Check for existing entry (same project + member), preferring the same tier
+        matches = index.get(project_key(proj["name"], proj["member"]), {})
+        entry = matches.get(tier)
+        if entry is not None:
+            # Update description if new one is longer (more detailed)
+            if len(proj["description"]) > len(entry["description"]):
+                entry["description"] = sanitize_field(proj["description"])
+            # Add project URL if we don't have one yet
+            if proj_url and not entry.get("url"):
+                entry["url"] = proj_url
+            append_post_link(entry, post_url)
+            continue
+
+        # Also check other tiers (project might have been promoted)
+        if matches:
+            entry = next(iter(matches.values()))
+            # Don't change tier — that's a member decision
+            if proj_url and not entry.get("url"):
+                entry["url"] = proj_url
+            append_post_link(entry, post_url)
+            continue
+
+        entry = {
+            "project": sanitize_field(proj["name"]),
+            "url": proj_url,
+            "member": member,
+            "description": sanitize_field(proj["description"]),
+            "links": f"[Post]({post_url})" if post_url else "",
+        }
+        existing.setdefault(tier, []).append(entry)
+        index.setdefault(project_key(entry["project"], member), {})[tier] = entry
+        added.append(proj)
+
+    return existing, added
+
+
+def tiers_from_projects(projects: list[dict]) -> dict[str, list[dict]]:
+    """Group freshly extracted projects (as backfill produces them) into rows per tier, by name."""
+    tiers: dict[str, list[dict]] = {tier: [] for tier in TIER_HEADERS}
+    for proj in projects:
+        tiers.setdefault(proj["tier"], []).append({
+            "project": proj["name"],
+            "url": proj.get("url", ""),
+            "member": proj["member"],
+            "description": proj["description"],
+            "links": proj["links"],
+        })
+    for entries in tiers.values():
+        entries.sort(key=lambda entry: entry["project"].lower())
+    return tiers
+
+
+# When extractions disagree about a project's tier, the most advanced one wins
+TIER_RANK = {"explorations": 0, "active_experiments": 1, "products_and_tools": 2}
+
+
+def reduce_member_projects(chunk_results: list[list[dict]]) -> list[dict]:
+    """Combine per-chunk extractions into one list with a single entry per project."""
+    merged: dict[str, dict] = {}
+    for projects in chunk_results:
+        for proj in projects:
+            key = normalize_name(proj["name"])
+            seen = merged.get(key)
+            if seen is None:
+                merged[key] = {**proj, "post_urls": list(proj["post_urls"])}
+                continue
+            if len(proj["description"]) > len(seen["description"]):
+                seen["description"] = proj["description"]
+            if proj["url"] and not seen["url"]:
+                seen["url"] = proj["url"]
+            if TIER_RANK.get(proj["tier"], 0) > TIER_RANK.get(seen["tier"], 0):
+                seen["tier"] = proj["tier"]
+            seen["confidence"] = max(seen["confidence"], proj["confidence"])
+            seen["post_urls"] += [url for url in proj["post_urls"] if url not in seen["post_urls"]]
+            seen["links"] = ", ".join(f"[Post]({url})" for url in seen["post_urls"])
+    return list(merged.values())
+
+
+DIRECTORY_INTRO = (
+    "# Community Project Directory\n\n"
+    "A living list of what AIC members are building. This post is a wiki — "
+    "edit it directly to add or update your projects. The list is also "
+    "updated automatically when you mention projects in your posts.\n"
+)
+
+TIER_CONFIG = [
+    ("products_and_tools", "Products & Tools", "Projects that are shipped, named, and available for use."),
+    ("active_experiments", "Active Experiments", "Things actively being built or prototyped."),
+    ("explorations", "Explorations", "Early-stage ideas and one-off experiments."),
+]
+
+
+def render_row(entry: dict) -> str:
+    """Render one directory row as a markdown table line."""
+    proj_cell = render_project_cell(entry["project"], entry.get("url", ""))
+    return f"| {proj_cell} | {entry['member']} | {entry['description']} | {entry['links']} |"
+
+
+def render_section(tier_title: str, tier_desc: str, rows: list[str]) -> str:
+    """Render a tier's heading, table header and already-rendered rows."""
+    lines = [f"## {tier_title}", f"{tier_desc}\n",
+             "| Project | Member | Description | Links |",
+             "|---------|--------|-------------|-------|"]
+    lines.extend(rows)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def render_footer() -> str:
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    return f"---\n*Last automated update: {now}*"
+
+
+def render_wiki_post(tiers: dict[str, list[dict]]) -> str:
+    """Render structured tier data back into wiki post markdown."""
+    sections = [DIRECTORY_INTRO]
+    for tier_key, tier_title, tier_desc in TIER_CONFIG:
+        rows = [render_row(entry) for entry in tiers.get(tier_key, [])]
+        sections.append(render_section(tier_title, tier_desc, rows))
+    sections.append(render_footer())
+    return "\n".join(sections)
+
+
+ROW_FIELDS = ("project", "url", "member", "description", "links")
+
+
+class RowChange(NamedTuple):
+    """One directory row added, removed or edited between two versions of the tiers."""
+
+    kind: str  # "added", "removed" or "changed"
+    tier: str
+    old: dict | None
+    new: dict | None
+
+
+def diff_tiers(old: dict[str, list[dict]], new: dict[str, list[dict]]) -> list[RowChange]:
+    """Rows that differ between two versions, matched by tier and project_key.
+
+    Rows sharing a key within a tier are paired up in order. A row that
+    moved tiers shows up as removed from one and added to the other.
+    """
+    changes = []
+    for tier_key, _, _ in TIER_CONFIG:
+        old_rows: dict[tuple, list[dict]] = {}
+        for entry in old.get(tier_key, []):
+            old_rows.setdefault(project_key(entry["project"], entry["member"]), []).append(entry)
+
+        for entry in new.get(tier_key, []):
+            matches = old_rows.get(project_key(entry["project"], entry["member"]))
+            if not matches:
+                changes.append(RowChange("added", tier_key, None, entry))
+                continue
+            previous = matches.pop(0)
+            if any(previous.get(field, "") != entry.get(field, "") for field in ROW_FIELDS):
+                changes.append(RowChange("changed", tier_key, previous, entry))
+
+        changes.extend(RowChange("removed", tier_key, entry, None)
+                       for entries in old_rows.values() for entry in entries)
+    return changes
+
+
+def format_row_change(change: RowChange) -> str:
+    """One line per change: +/-/~, tier, row, and for edits the fields that changed."""
+    tier_title = next(title for key, title, _ in TIER_CONFIG if key == change.tier)
+    entry = change.new or change.old
+    label = f"{tier_title}: {entry['project']} ({entry['member']})"
+    if change.kind == "added":
+        return f"+ {label} — {entry['description']}"
+    if change.kind == "removed":
+        return f"- {label}"
+
+    edits = []
+    for field in ROW_FIELDS:
+        before, after = change.old.get(field, ""), change.new.get(field, "")
+        if before == after:
+            continue
+        if before and after.startswith(before):
+            edits.append(f"{field} +{after[len(before):].lstrip(', ')!r}")
+        else:
+            edits.append(f"{field} {before!r} -> {after!r}")
+    return f"~ {label} — {'; '.join(edits)}"
+
+
+class WikiRenderer:
+    """render_wiki_post that re-renders only the parts of the directory that changed.
+
+    Each tier's rows are cached in fixed-size blocks, together with a copy
+    of the rows each block was rendered from. A block whose rows compare
+    equal is spliced in as-is, and a tier with no changed blocks reuses its
+    whole section. Finding the changed blocks still compares every row with
+    its cached copy, so a render is O(rows); what it saves is formatting and
+    joining the unchanged ones. The output is always identical to
+    render_wiki_post. Not thread-safe; give each writer its own renderer.
+    """
+
+    BLOCK_ROWS = 128
+
+    def __init__(self):
+        # tier -> ([(copy of the block's rows, rendered lines)], section text)
+        self._sections: dict[str, tuple[list[tuple[list[dict], str]], str]] = {}
+
+    def render(self, tiers: dict[str, list[dict]]) -> str:
+        sections = [DIRECTORY_INTRO]
+        for tier_key, tier_title, tier_desc in TIER_CONFIG:
+            sections.append(self._render_tier(tier_key, tier_title, tier_desc, tiers.get(tier_key, [])))
+        sections.append(render_footer())
+        return "\n".join(sections)
+
+    def _render_tier(self, tier_key: str, tier_title: str, tier_desc: str, entries: list[dict]) -> str:
+        old_blocks, old_text = self._sections.get(tier_key, ([], None))
+        blocks = []
+        changed = len(entries) != sum(len(rows) for rows, _ in old_blocks)
+        for i in range(0, len(entries), self.BLOCK_ROWS):
+            rows = entries[i:i + self.BLOCK_ROWS]
+            n = i // self.BLOCK_ROWS
+            if n < len(old_blocks) and old_blocks[n][0] == rows:
+                blocks.append(old_blocks[n])
+                continue
+            # Copy the rows: callers such as merge_projects mutate entries in place
+            blocks.append(([dict(entry) for entry in rows], "\n".join(render_row(entry) for entry in rows)))
+            changed = True
+
+        if changed or old_text is None:
+            old_text = render_section(tier_title, tier_desc, [text for _, text in blocks])
+        self._sections[tier_key] = (blocks, old_text)
+        return old_text
@@ -5,27 +5,78 @@ Receives Resend inbound email webhooks (metadata only), fetches
 the raw email via Resend API, and forwards to Discourse's
 handle_mail endpoint.
 
+Webhooks are answered as soon as the email is recorded in a local
+SQLite spool; a pool of worker threads does the fetching and
+forwarding, so a slow download or Discourse never delays intake.
+Failed forwards are retried with exponential backoff and end up in
+a dead-letter state after MAX_ATTEMPTS. Outgoing HTTP goes through a
+keep-alive connection pool with timeouts and a concurrency cap per
+upstream. Raw messages are streamed from the download to a file in the
+spool and from there to Discourse, so memory use doesn't grow with
+attachment size. Svix redeliveries (same svix-id or Resend email_id)
+are acknowledged without being processed again.
+
+Usage:
+    resend-webhook.py [serve]              # run the bridge (default)
+    resend-webhook.py inspect [--status dead]
+    resend-webhook.py replay ID [ID ...]   # or: replay --dead
+
 Security: Verifies Svix webhook signatures using HMAC-SHA256.
 """
+import argparse
 import base64
 import hashlib
 import hmac
-import json
+import http.client
 import http.server
+import io
+import json
 import os
+import random
+import signal
+import sqlite3
+import sys
+import threading
 import time
-import urllib.request
+import urllib.error
 import urllib.parse
 import ssl
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
 
-DISCOURSE_URL = os.environ["DISCOURSE_URL"]
-DISCOURSE_API_KEY = os.environ["DISCOURSE_API_KEY"]
-RESEND_API_KEY = os.environ["RESEND_API_KEY"]
+# Required to serve; inspect and replay only need SPOOL_DIR
+DISCOURSE_URL = os.environ.get("DISCOURSE_URL", "")
+DISCOURSE_API_KEY = os.environ.get("DISCOURSE_API_KEY", "")
+RESEND_API_KEY = os.environ.get("RESEND_API_KEY", "")
+RESEND_API_URL = os.environ.get("RESEND_API_URL", "https://api.resend.com")
 WEBHOOK_SIGNING_SECRET = os.environ.get("WEBHOOK_SIGNING_SECRET", "")
 PORT = int(os.environ.get("WEBHOOK_PORT", "8025"))
+SPOOL_DIR = os.environ.get("SPOOL_DIR", "/var/lib/resend-webhook")
+WORKER_COUNT = int(os.environ.get("WORKER_COUNT", "4"))
+# Workers also re-check the spool this often, for wakeups and retries coming due
+WORKER_POLL_SECONDS = 5
+# Retry backoff doubles from RETRY_BASE_SECONDS up to RETRY_MAX_SECONDS; the
+# defaults keep retrying for about 5 hours before giving up
+MAX_ATTEMPTS = int(os.environ.get("MAX_ATTEMPTS", "12"))
+RETRY_BASE_SECONDS = float(os.environ.get("RETRY_BASE_SECONDS", "30"))
+RETRY_MAX_SECONDS = float(os.environ.get("RETRY_MAX_SECONDS", "3600"))
+# Outgoing HTTP: the read timeout applies to each socket read, not the whole call
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "60"))
+# Larger emails are dead-lettered instead of downloaded
+MAX_EMAIL_BYTES = int(os.environ.get("MAX_EMAIL_BYTES", str(50 * 1024 * 1024)))
+# How long delivery ids are remembered; Svix stops redelivering after about a day
+DEDUPE_TTL_SECONDS = float(os.environ.get("DEDUPE_TTL_SECONDS", str(3 * 24 * 3600)))
+# Webhook payloads are metadata only
+MAX_WEBHOOK_BYTES = 1024 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+# Concurrent calls allowed per upstream, whatever WORKER_COUNT is
+UPSTREAM_CONCURRENCY = {
+    "resend": int(os.environ.get("RESEND_CONCURRENCY", "4")),
+    "download": int(os.environ.get("DOWNLOAD_CONCURRENCY", "4")),
+    "discourse": int(os.environ.get("DISCOURSE_CONCURRENCY", "2")),
+}
 
 # Svix signature tolerance: reject timestamps older than 5 minutes
 TIMESTAMP_TOLERANCE = 300
@@ -86,47 +137,442 @@ def verify_svix_signature(body: bytes, headers: dict) -> bool:
     return False
 
 
-def fetch_raw_email(email_id):
-    """Fetch raw email content from Resend API."""
-    url = f"https://api.resend.com/emails/receiving/{email_id}"
-    req = urllib.request.Request(url, headers={
-        "Authorization": f"Bearer {RESEND_API_KEY}",
-    })
-    resp = urllib.request.urlopen(req)
-    data = json.loads(resp.read())
+class ResponseTooLarge(Exception):
+    """A streamed response body went over its size limit."""
+
+
+class HTTPPool:
+    """Keep-alive HTTP(S) connections per host, shared by the workers.
+
+    Saves a TLS handshake per call to Resend, the download host and
+    Discourse. Every call has connect and read timeouts, waits for a slot
+    in its upstream's concurrency limit, and is timed. Responses of 400
+    and up raise urllib.error.HTTPError, like urlopen.
+
+    For large transfers, `body` can be a function returning an iterable of
+    byte chunks (called again if the request has to be re-sent; pass
+    Content-Length in the headers), and a successful response body can be
+    written to a `sink` file in chunks, up to `max_bytes`.
+    """
+
+    IDLE_SECONDS = 30  # Drop pooled connections the server has probably closed
+    MAX_REDIRECTS = 5
+    # Errors that mean a pooled connection was closed by the server while idle
+    STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+    def __init__(self, limits):
+        self._ssl_context = ssl.create_default_context()
+        self._lock = threading.Lock()
+        self._idle = {}  # (scheme, host, port) -> [(connection, idle since)]
+        self._limits = {upstream: threading.BoundedSemaphore(n) for upstream, n in limits.items()}
+        self._stats = {upstream: {"calls": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0}
+                       for upstream in limits}
+
+    def request(self, upstream, method, url, body=None, headers=None, sink=None, max_bytes=None):
+        """Make a call through `upstream`'s limit. Returns (status, headers, body bytes).
+
+        With a sink, a 2xx body goes to the sink and the returned body is empty.
+        """
+        headers = {"User-Agent": "resend-webhook-bridge", **(headers or {})}
+        for _ in range(self.MAX_REDIRECTS + 1):
+            with self._limits[upstream]:
+                status, resp_headers, data = self._timed_request(
+                    upstream, method, url, body, headers, sink, max_bytes)
+            if status not in (301, 302, 303, 307, 308) or "Location" not in resp_headers:
+                break
+            url = urllib.parse.urljoin(url, resp_headers["Location"])
+            if status == 303 or (status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, http.client.responses.get(status, ""),
+                                         resp_headers, io.BytesIO(data))
+        return status, resp_headers, data
+
+    def summary(self):
+        with self._lock:
+            return {upstream: {**stats, "seconds": round(stats["seconds"], 3),
+                               "avg_ms": round(1000 * stats["seconds"] / stats["calls"]) if stats["calls"] else 0}
+                    for upstream, stats in self._stats.items()}
+
+    def _timed_request(self, upstream, method, url, body, headers, sink, max_bytes):
+        parts = urllib.parse.urlsplit(url)
+        start = time.monotonic()
+        status = None
+        try:
+            status, resp_headers, data = self._send(parts, method, body, headers, sink, max_bytes)
+            return status, resp_headers, data
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                stats = self._stats[upstream]
+                stats["calls"] += 1
+                stats["errors"] += status is None or status >= 400
+                stats["seconds"] += elapsed
+                stats["max_seconds"] = max(stats["max_seconds"], round(elapsed, 3))
+            # Host only: signed download URLs carry credentials in the query
+            logging.info("HTTP %s %s %s -> %s in %.0f ms", upstream, method, parts.hostname,
+                         status or "error", elapsed * 1000)
+
+    def _send(self, parts, method, body, headers, sink, max_bytes):
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        while True:
+            conn, reused = self._checkout(key)
+            try:
+                conn.request(method, path, body=body() if callable(body) else body, headers=headers)
+                resp = conn.getresponse()
+                if sink is not None and 200 <= resp.status < 300:
+                    data = b""
+                    self._read_into(resp, sink, max_bytes)
+                else:
+                    data = resp.read()
+            except self.STALE_ERRORS:
+                conn.close()
+                if reused:
+                    if sink is not None:
+                        sink.seek(0)
+                        sink.truncate()
+                    continue  # Try again on a fresh connection
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return resp.status, resp.headers, data
+
+    @staticmethod
+    def _read_into(resp, sink, max_bytes):
+        length = resp.getheader("Content-Length")
+        if max_bytes is not None and length and length.isdigit() and int(length) > max_bytes:
+            raise ResponseTooLarge(f"{length} bytes is over the {max_bytes} byte limit")
+        total = 0
+        while chunk := resp.read(STREAM_CHUNK_BYTES):
+            total += len(chunk)
+            if max_bytes is not None and total > max_bytes:
+                raise ResponseTooLarge(f"more than the {max_bytes} byte limit")
+            sink.write(chunk)
+
+    def _checkout(self, key):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, since = idle.pop()
+                if now - since < self.IDLE_SECONDS:
+                    return conn, True
+                conn.close()
+
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=HTTP_CONNECT_TIMEOUT,
+                                               context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=HTTP_CONNECT_TIMEOUT)
+        conn.connect()
+        conn.sock.settimeout(HTTP_READ_TIMEOUT)
+        return conn, False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            self._idle.setdefault(key, []).append((conn, time.monotonic()))
+
+
+http_pool = HTTPPool(UPSTREAM_CONCURRENCY)
+
+
+def fetch_raw_email(email_id, path):
+    """Download the raw email from Resend into `path`. Returns False if there is no download yet."""
+    _, _, body = http_pool.request("resend", "GET", f"{RESEND_API_URL}/emails/receiving/{email_id}",
+                                   headers={"Authorization": f"Bearer {RESEND_API_KEY}"})
+    data = json.loads(body)
 
     raw_info = data.get("raw", {})
     download_url = raw_info.get("download_url", "")
 
     if not download_url:
         logging.warning("No raw download URL for email %s", email_id)
-        return None
-
-    # Download the raw email from the signed URL
-    raw_req = urllib.request.Request(download_url)
-    raw_resp = urllib.request.urlopen(raw_req)
-    return raw_resp.read().decode("utf-8", errors="replace")
-
-
-def forward_to_discourse(raw_email):
-    """Forward raw email to Discourse handle_mail endpoint."""
-    data = urllib.parse.urlencode({"email": raw_email}).encode()
-    req = urllib.request.Request(
-        f"{DISCOURSE_URL}/admin/email/handle_mail",
-        data=data,
-        headers={
-            "Api-Key": DISCOURSE_API_KEY,
-            "Api-Username": "bfeld",
-            "Content-Type": "application/x-www-form-urlencoded",
-        },
-    )
-    resp = urllib.request.urlopen(req)
-    return resp.status
+        return False
+
+    # Stream from the signed URL to a temporary file; only a complete download gets `path`
+    with open(f"{path}.tmp", "wb") as f:
+        http_pool.request("download", "GET", download_url, sink=f, max_bytes=MAX_EMAIL_BYTES)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+    return True
+
+
+def encoded_form_chunks(path, field):
+    """Yield `field=<file contents>` form-urlencoded, a chunk at a time."""
+    yield f"{field}=".encode()
+    with open(path, "rb") as f:
+        while chunk := f.read(STREAM_CHUNK_BYTES):
+            # Percent-encoding is per byte, so chunks can be encoded separately
+            yield urllib.parse.quote_plus(chunk).encode()
+
+
+def forward_to_discourse(raw_path):
+    """Stream a spooled raw email to Discourse's handle_mail endpoint."""
+    # One extra read of the file to size the body, so no chunked upload is needed
+    length = sum(len(chunk) for chunk in encoded_form_chunks(raw_path, "email"))
+    status, _, _ = http_pool.request("discourse", "POST", f"{DISCOURSE_URL}/admin/email/handle_mail",
+                                     body=lambda: encoded_form_chunks(raw_path, "email"), headers={
+                                         "Api-Key": DISCOURSE_API_KEY,
+                                         "Api-Username": "bfeld",
+                                         "Content-Type": "application/x-www-form-urlencoded",
+                                         "Content-Length": str(length),
+                                     })
+    return status
+
+
+class PermanentError(Exception):
+    """A failure that retrying will not fix; the email goes straight to dead-letter."""
+
+
+class Spool:
+    """Received emails waiting to be fetched and forwarded, in SQLite.
+
+    An email is committed here before the webhook is answered, so a crash
+    or restart never loses one: rows left "working" by a dead process go
+    back to "pending" on startup. Once downloaded, the raw message is kept
+    under raw/ so retries only repeat the forward. Failures are retried
+    with exponential backoff; after MAX_ATTEMPTS (or a permanent error)
+    the row becomes "dead" and stays until replayed. Forwarded emails are
+    deleted.
+
+    The svix-id and email_id of every spooled email are also remembered
+    for DEDUPE_TTL_SECONDS, so a redelivered webhook isn't spooled twice.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.raw_dir = os.path.join(directory, "raw")
+        os.makedirs(self.raw_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "spool.sqlite3"),
+                                   check_same_thread=False, isolation_level=None)
+        # inspect and replay share the database with a running bridge
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # fsync every commit: a 200 tells Svix the email is safe with us
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS emails (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email_id TEXT NOT NULL,
+                svix_id TEXT,
+                sender TEXT,
+                subject TEXT,
+                status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'working', 'dead')),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                raw_path TEXT,
+                received_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS emails_status ON emails (status, next_attempt_at)")
+        # Keys are "svix:<svix-id>" and "email:<email_id>"
+        self._db.execute("CREATE TABLE IF NOT EXISTS deliveries (key TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS deliveries_seen_at ON deliveries (seen_at)")
+        self._pruned_at = 0
+
+    def recover(self):
+        """Re-queue emails left mid-forward by an earlier run."""
+        with self._lock:
+            recovered = self._db.execute("UPDATE emails SET status = 'pending' WHERE status = 'working'").rowcount
+        if recovered:
+            logging.info("Re-queued %d email(s) interrupted by the last shutdown", recovered)
+
+    def seen(self, *keys):
+        """Whether any of these delivery keys was recorded within DEDUPE_TTL_SECONDS."""
+        keys = [key for key in keys if key]
+        if not keys:
+            return False
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            return self._db.execute(
+                f"SELECT 1 FROM deliveries WHERE key IN ({marks}) AND seen_at > ? LIMIT 1",
+                (*keys, time.time() - DEDUPE_TTL_SECONDS)).fetchone() is not None
+
+    def add(self, email_id, svix_id, sender, subject):
+        """Spool an email unless its svix-id or email_id was already seen. Returns whether it was added."""
+        keys = [f"email:{email_id}"] + ([f"svix:{svix_id}"] if svix_id else [])
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            marks = ",".join("?" * len(keys))
+            # Check and insert in one transaction, so concurrent redeliveries can't both get in
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self._db.execute(f"SELECT 1 FROM deliveries WHERE key IN ({marks}) AND seen_at > ?",
+                                    (*keys, now - DEDUPE_TTL_SECONDS)).fetchone():
+                    self._db.execute("ROLLBACK")
+                    return False
+                self._db.execute(
+                    "INSERT INTO emails (email_id, svix_id, sender, subject, received_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (email_id, svix_id, sender, subject, now, now))
+                self._db.executemany("INSERT OR REPLACE INTO deliveries (key, seen_at) VALUES (?, ?)",
+                                     [(key, now) for key in keys])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return True
+
+    def _prune(self, now):
+        """Forget expired delivery ids, at most once an hour. Caller holds the lock."""
+        if now - self._pruned_at < 3600:
+            return
+        self._pruned_at = now
+        self._db.execute("DELETE FROM deliveries WHERE seen_at <= ?", (now - DEDUPE_TTL_SECONDS,))
+
+    def delivery_count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM deliveries WHERE seen_at > ?",
+                                    (time.time() - DEDUPE_TTL_SECONDS,)).fetchone()[0]
+
+    def claim(self):
+        """Mark the oldest due email as being worked on and return (id, email_id, raw_path), or None."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, email_id, raw_path FROM emails "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id LIMIT 1", (now,)).fetchone()
+            if row:
+                self._db.execute(
+                    "UPDATE emails SET status = 'working', attempts = attempts + 1, updated_at = ? "
+                    "WHERE id = ?", (now, row[0]))
+            return row
+
+    def raw_path(self, row_id):
+        return os.path.join(self.raw_dir, f"{row_id}.eml")
+
+    def set_raw(self, row_id, path):
+        """Record a downloaded message so retries don't need to fetch it again."""
+        with self._lock:
+            self._db.execute("UPDATE emails SET raw_path = ? WHERE id = ?", (path, row_id))
+
+    def finish(self, row_id, raw_path):
+        with self._lock:
+            self._db.execute("DELETE FROM emails WHERE id = ?", (row_id,))
+        if raw_path:
+            try:
+                os.remove(raw_path)
+            except FileNotFoundError:
+                pass
+
+    def fail(self, row_id, error, permanent=False):
+        """Schedule a retry with backoff, or dead-letter the email. Returns the new status."""
+        now = time.time()
+        with self._lock:
+            (attempts,) = self._db.execute("SELECT attempts FROM emails WHERE id = ?", (row_id,)).fetchone()
+            if permanent or attempts >= MAX_ATTEMPTS:
+                status, next_attempt_at = "dead", 0
+            else:
+                delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+                # Jitter, so emails that failed together don't retry together
+                status, next_attempt_at = "pending", now + delay * random.uniform(0.8, 1.2)
+            self._db.execute(
+                "UPDATE emails SET status = ?, last_error = ?, next_attempt_at = ?, updated_at = ? WHERE id = ?",
+                (status, error, next_attempt_at, now, row_id))
+        return status, next_attempt_at
+
+    def replay(self, row_ids=None):
+        """Re-queue dead emails (all of them, or the given ids) with a fresh set of attempts."""
+        query = "UPDATE emails SET status = 'pending', attempts = 0, next_attempt_at = 0, updated_at = ? "
+        with self._lock:
+            if row_ids is None:
+                return self._db.execute(query + "WHERE status = 'dead'", (time.time(),)).rowcount
+            marks = ",".join("?" * len(row_ids))
+            return self._db.execute(query + f"WHERE id IN ({marks}) AND status != 'working'",
+                                    (time.time(), *row_ids)).rowcount
+
+    def rows(self, status=None):
+        query = ("SELECT id, status, attempts, next_attempt_at, received_at, email_id, sender, subject, "
+                 "last_error, raw_path FROM emails")
+        with self._lock:
+            if status:
+                return self._db.execute(query + " WHERE status = ? ORDER BY id", (status,)).fetchall()
+            return self._db.execute(query + " ORDER BY id").fetchall()
+
+
+spool = None
+work_available = threading.Event()
+stopping = threading.Event()
+
+
+def process_email(row_id, email_id, raw_path):
+    """Fetch one received email from Resend (unless already spooled) and hand it to Discourse."""
+    if not (raw_path and os.path.exists(raw_path)):
+        raw_path = spool.raw_path(row_id)
+        try:
+            downloaded = fetch_raw_email(email_id, raw_path)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise PermanentError(f"Resend has no email {email_id}") from e
+            raise
+        except ResponseTooLarge as e:
+            raise PermanentError(f"Raw email is too large: {e} (MAX_EMAIL_BYTES)") from e
+        finally:
+            if os.path.exists(f"{raw_path}.tmp"):
+                os.remove(f"{raw_path}.tmp")
+        if not downloaded:
+            # Resend may not have stored the message yet, so this is retried
+            raise RuntimeError("no raw email available yet")
+        spool.set_raw(row_id, raw_path)
+
+    try:
+        status = forward_to_discourse(raw_path)
+    except urllib.error.HTTPError as e:
+        # Discourse rejected this email itself; sending it again won't help
+        if 400 <= e.code < 500 and e.code not in (408, 429):
+            raise PermanentError(f"Discourse rejected the email: HTTP {e.code}") from e
+        raise
+    logging.info("Forwarded %s to Discourse: status=%s", email_id, status)
+    return raw_path
+
+
+def worker_loop():
+    while not stopping.is_set():
+        # Clear before claiming, so an email spooled after this point wakes us
+        work_available.clear()
+        item = spool.claim()
+        if item is None:
+            work_available.wait(WORKER_POLL_SECONDS)
+            continue
+
+        row_id, email_id, raw_path = item
+        try:
+            raw_path = process_email(row_id, email_id, raw_path)
+        except Exception as e:
+            status, next_attempt_at = spool.fail(row_id, str(e), permanent=isinstance(e, PermanentError))
+            if status == "dead":
+                logging.error("Giving up on email %s (spool id %s): %s", email_id, row_id, e)
+            else:
+                logging.warning("Error forwarding email %s: %s — retrying in %.0fs",
+                                email_id, e, next_attempt_at - time.time())
+        else:
+            spool.finish(row_id, raw_path)
 
 
 class WebhookHandler(http.server.BaseHTTPRequestHandler):
     def do_POST(self):
         content_length = int(self.headers.get("Content-Length", 0))
+        if content_length > MAX_WEBHOOK_BYTES:
+            logging.warning("Rejected webhook: %d byte body from %s", content_length, self.client_address[0])
+            self.send_response(413)
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            return
         body = self.rfile.read(content_length)
 
         # Verify webhook signature
@@ -137,39 +583,56 @@ class WebhookHandler(http.server.BaseHTTPRequestHandler):
             self.end_headers()
             return
 
+        # A redelivery of something already spooled: don't fetch or forward it again
+        svix_id = header_dict.get("svix-id", "")
+        if svix_id and spool.seen(f"svix:{svix_id}"):
+            logging.info("Duplicate webhook %s — already spooled", svix_id)
+            self.send_json(200, {"status": "duplicate"})
+            return
+
         try:
             payload = json.loads(body)
-            event_type = payload.get("type", "")
-            logging.info("Received webhook: type=%s", event_type)
-
-            if event_type == "email.received":
-                data = payload.get("data", {})
-                email_id = data.get("email_id", "")
-                from_addr = data.get("from", "unknown")
-                subject = data.get("subject", "no subject")
-                logging.info("Email from=%s subject=%s id=%s", from_addr, subject, email_id)
-
-                if email_id:
-                    raw_email = fetch_raw_email(email_id)
-                    if raw_email:
-                        status = forward_to_discourse(raw_email)
-                        logging.info("Forwarded to Discourse: status=%s", status)
-                    else:
-                        logging.warning("Could not fetch raw email for %s", email_id)
-                else:
-                    logging.warning("No email_id in webhook payload")
-
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"status": "ok"}).encode())
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            # Svix retries anything but a 2xx, and a redelivery won't parse any better
+            logging.error("Ignoring webhook %s: body is not a JSON object: %r", svix_id or "-", body[:1000])
+            self.send_json(200, {"status": "ignored", "message": "invalid JSON"})
+            return
 
-        except Exception as e:
-            logging.error("Error processing webhook: %s", e, exc_info=True)
-            self.send_response(200)  # Return 200 to prevent retries
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"status": "error", "message": str(e)}).encode())
+        event_type = payload.get("type", "")
+        logging.info("Received webhook: type=%s", event_type)
+
+        if event_type == "email.received":
+            data = payload.get("data", {})
+            email_id = data.get("email_id", "")
+            from_addr = data.get("from", "unknown")
+            subject = data.get("subject", "no subject")
+            logging.info("Email from=%s subject=%s id=%s", from_addr, subject, email_id)
+
+            if email_id:
+                try:
+                    added = spool.add(email_id, svix_id, from_addr, subject)
+                except sqlite3.Error as e:
+                    # Not recorded, so let Svix redeliver it
+                    logging.error("Could not spool email %s: %s", email_id, e, exc_info=True)
+                    self.send_json(503, {"status": "error", "message": "spool unavailable"})
+                    return
+                if not added:
+                    logging.info("Duplicate email %s — already spooled", email_id)
+                    self.send_json(200, {"status": "duplicate"})
+                    return
+                work_available.set()
+            else:
+                logging.warning("No email_id in webhook payload")
+
+        self.send_json(200, {"status": "ok"})
+
+    def send_json(self, status, data):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode())
 
     def do_GET(self):
         self.send_response(200)
@@ -180,10 +643,86 @@ class WebhookHandler(http.server.BaseHTTPRequestHandler):
         pass  # Suppress default access logs
 
 
-if __name__ == "__main__":
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)) if timestamp else "-"
+
+
+def inspect_spool(args):
+    rows = spool.rows(args.status)
+    counts = {}
+    for row in spool.rows():
+        counts[row[1]] = counts.get(row[1], 0) + 1
+    print("Spool:", ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) or "empty")
+    print(f"Remembering {spool.delivery_count()} delivery id(s) for deduplication")
+    for (row_id, status, attempts, next_attempt_at, received_at, email_id, sender, subject,
+         last_error, raw_path) in rows:
+        print(f"\n#{row_id} {status} (attempt {attempts}/{MAX_ATTEMPTS}) email_id={email_id}")
+        print(f"  from: {sender}  subject: {subject}")
+        print(f"  received: {format_time(received_at)}", end="")
+        if status == "pending" and next_attempt_at:
+            print(f"  next attempt: {format_time(next_attempt_at)}", end="")
+        print(f"  raw: {raw_path or 'not downloaded'}")
+        if last_error:
+            print(f"  last error: {last_error}")
+
+
+def replay_spool(args):
+    if args.dead:
+        count = spool.replay()
+    elif args.ids:
+        count = spool.replay(args.ids)
+    else:
+        sys.exit("replay: give spool ids or --dead")
+    print(f"Re-queued {count} email(s); a running bridge picks them up within {WORKER_POLL_SECONDS}s")
+
+
+def serve(args):
+    missing = [name for name in ("DISCOURSE_URL", "DISCOURSE_API_KEY", "RESEND_API_KEY")
+               if not os.environ.get(name)]
+    if missing:
+        sys.exit(f"Missing environment variables: {', '.join(missing)}")
+
     sig_status = "ENABLED" if WEBHOOK_SIGNING_SECRET else "DISABLED (no secret)"
     logging.info("Config: DISCOURSE_URL=%s PORT=%s API_KEY=...%s RESEND_KEY=...%s SIG_VERIFY=%s",
                  DISCOURSE_URL, PORT, DISCOURSE_API_KEY[-6:], RESEND_API_KEY[-6:], sig_status)
-    server = http.server.HTTPServer(("0.0.0.0", PORT), WebhookHandler)
-    logging.info("Webhook bridge listening on 0.0.0.0:%s", PORT)
+    spool.recover()
+    workers = [threading.Thread(target=worker_loop, name=f"worker-{i}", daemon=True)
+               for i in range(WORKER_COUNT)]
+    for worker in workers:
+        worker.start()
+
+    server = http.server.ThreadingHTTPServer(("0.0.0.0", PORT), WebhookHandler)
+    server.daemon_threads = True
+
+    def shut_down(signum, frame):
+        # shutdown() waits for serve_forever() to return, so it can't run on this thread
+        stopping.set()
+        work_available.set()
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, shut_down)
+    logging.info("Webhook bridge listening on 0.0.0.0:%s with %d worker(s), spool in %s",
+                 PORT, WORKER_COUNT, SPOOL_DIR)
     server.serve_forever()
+    # Emails still being forwarded are re-queued on the next start
+    for worker in workers:
+        worker.join(timeout=10)
+    logging.info("Upstream calls: %s", http_pool.summary())
+    logging.info("Stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resend inbound email -> Discourse bridge")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("serve", help="Run the webhook bridge (default)")
+    inspect_parser = commands.add_parser("inspect", help="Show spooled emails")
+    inspect_parser.add_argument("--status", choices=["pending", "working", "dead"],
+                                help="Only show emails in this state")
+    replay_parser = commands.add_parser("replay", help="Re-queue dead-lettered emails")
+    replay_parser.add_argument("ids", type=int, nargs="*", help="Spool ids (from inspect)")
+    replay_parser.add_argument("--dead", action="store_true", help="Re-queue every dead email")
+    args = parser.parse_args()
+
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    spool = Spool(SPOOL_DIR)
+    {"inspect": inspect_spool, "replay": replay_spool}.get(args.command, serve)(args)
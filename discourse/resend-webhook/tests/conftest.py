@@ -0,0 +1,83 @@
+import http.server
+import importlib.util
+import os
+import threading
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resend-webhook.py")
+
+
+@pytest.fixture(scope="session")
+def bridge():
+    """The bridge script as a module; its name has a hyphen, so it can't be imported normally."""
+    spec = importlib.util.spec_from_file_location("resend_webhook", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def spool(bridge, tmp_path, monkeypatch):
+    """A fresh spool, installed as the bridge's global one."""
+    spool = bridge.Spool(str(tmp_path / "spool"))
+    monkeypatch.setattr(bridge, "spool", spool)
+    return spool
+
+
+class FakeUpstream(http.server.ThreadingHTTPServer):
+    """A keep-alive HTTP/1.1 server standing in for Resend, the download host and Discourse.
+
+    `routes` maps a path (without query) to (status, headers, body); a
+    callable body is called with the handler instead. Every request is
+    recorded as (client address, method, path, body).
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeUpstreamHandler)
+        self.routes = {}
+        self.requests = []
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+
+    def connections(self):
+        return {client for client, _, _, _ in self.requests}
+
+
+class FakeUpstreamHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.handle_any()
+
+    def do_POST(self):
+        self.handle_any()
+
+    def handle_any(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        path = self.path.partition("?")[0]
+        self.server.requests.append((self.client_address, self.command, path, body))
+        status, headers, payload = self.server.routes.get(path, (404, {}, b"not found"))
+        if callable(payload):
+            payload(self)
+            return
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = FakeUpstream()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import hmac
+import http.client
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+SECRET = b"test-signing-key"
+
+
+def test_a_repeated_svix_id_or_email_id_is_not_spooled_again(spool):
+    assert spool.add("e1", "msg_1", "al@example.com", "Hi") is True
+
+    assert spool.add("e1", "msg_2", "al@example.com", "Hi") is False  # Same email, new delivery id
+    assert spool.add("e2", "msg_1", "al@example.com", "Hi") is False  # Same delivery id
+    assert spool.seen("svix:msg_1") and spool.seen("email:e1")
+    assert len(spool.rows()) == 1
+
+
+def test_delivery_ids_are_forgotten_after_the_ttl(bridge, spool, monkeypatch):
+    monkeypatch.setattr(bridge, "DEDUPE_TTL_SECONDS", 60)
+    now = [1_000_000.0]
+    monkeypatch.setattr(bridge.time, "time", lambda: now[0])
+    spool.add("e1", "msg_1", "al@example.com", "Hi")
+
+    now[0] += 61
+    assert not spool.seen("svix:msg_1")
+    assert spool.add("e1", "msg_1", "al@example.com", "Hi") is True
+
+
+def test_the_dedupe_record_survives_a_restart(bridge, spool):
+    spool.add("e1", "msg_1", "al@example.com", "Hi")
+    spool.finish(1, None)
+
+    restarted = bridge.Spool(spool.directory)
+
+    assert restarted.add("e1", "msg_1", "al@example.com", "Hi") is False
+    assert restarted.delivery_count() == 2
+
+
+def test_concurrent_redeliveries_spool_the_email_once(bridge, spool):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(spool.add("e1", "msg_1", "al", "Hi")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [False] * 7 + [True]
+    assert len(spool.rows()) == 1
+
+
+@pytest.fixture
+def webhook_url(bridge, spool, monkeypatch):
+    monkeypatch.setattr(bridge, "WEBHOOK_SIGNING_SECRET", "whsec_" + base64.b64encode(SECRET).decode())
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), bridge.WebhookHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def deliver(address, svix_id, email_id):
+    body = json.dumps({"type": "email.received",
+                       "data": {"email_id": email_id, "from": "al@example.com", "subject": "Hi"}}).encode()
+    timestamp = str(int(time.time()))
+    signature = base64.b64encode(
+        hmac.new(SECRET, f"{svix_id}.{timestamp}.".encode() + body, hashlib.sha256).digest()).decode()
+    conn = http.client.HTTPConnection(*address)
+    conn.request("POST", "/", body=body, headers={
+        "Content-Type": "application/json",
+        "svix-id": svix_id,
+        "svix-timestamp": timestamp,
+        "svix-signature": f"v1,{signature}",
+    })
+    resp = conn.getresponse()
+    result = resp.status, json.loads(resp.read())
+    conn.close()
+    return result
+
+
+def test_the_webhook_acknowledges_redeliveries_as_duplicates(spool, webhook_url):
+    assert deliver(webhook_url, "msg_1", "e1") == (200, {"status": "ok"})
+    assert deliver(webhook_url, "msg_1", "e1") == (200, {"status": "duplicate"})
+    assert deliver(webhook_url, "msg_2", "e1") == (200, {"status": "duplicate"})
+    assert deliver(webhook_url, "msg_3", "e2") == (200, {"status": "ok"})
+
+    assert [row[5] for row in spool.rows()] == ["e1", "e2"]
@@ -0,0 +1,92 @@
+import threading
+import time
+import urllib.error
+
+import pytest
+
+
+def test_requests_reuse_one_keep_alive_connection(bridge, upstream):
+    upstream.routes["/ok"] = (200, {}, b"ok")
+    pool = bridge.HTTPPool({"api": 2})
+
+    results = [pool.request("api", "GET", f"{upstream.url}/ok")[::2] for _ in range(3)]
+
+    assert results == [(200, b"ok")] * 3
+    assert len(upstream.connections()) == 1
+    assert pool.summary()["api"]["calls"] == 3
+
+
+def test_error_statuses_raise_http_error(bridge, upstream):
+    pool = bridge.HTTPPool({"api": 1})
+
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        pool.request("api", "GET", f"{upstream.url}/missing")
+
+    assert excinfo.value.code == 404
+    assert excinfo.value.read() == b"not found"
+    assert pool.summary()["api"]["errors"] == 1
+
+
+def test_redirects_are_followed(bridge, upstream):
+    upstream.routes["/old"] = (302, {"Location": "/new?sig=1"}, b"")
+    upstream.routes["/new"] = (200, {}, b"moved")
+    pool = bridge.HTTPPool({"api": 1})
+
+    assert pool.request("api", "GET", f"{upstream.url}/old")[2] == b"moved"
+    assert [path for _, _, path, _ in upstream.requests] == ["/old", "/new"]
+
+
+def test_a_connection_closed_while_idle_is_retried_on_a_fresh_one(bridge, upstream):
+    def reply_then_hang_up(handler):
+        # No "Connection: close", so the client pools a connection that is about to die
+        handler.send_response(200)
+        handler.send_header("Content-Length", "2")
+        handler.end_headers()
+        handler.wfile.write(b"ok")
+        handler.close_connection = True
+
+    upstream.routes["/flaky"] = (200, {}, reply_then_hang_up)
+    pool = bridge.HTTPPool({"api": 1})
+
+    pool.request("api", "GET", f"{upstream.url}/flaky")
+    time.sleep(0.1)
+    assert pool.request("api", "GET", f"{upstream.url}/flaky")[2] == b"ok"
+    assert len(upstream.connections()) == 2
+
+
+def test_each_upstream_has_a_concurrency_limit(bridge, upstream):
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow(handler):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.pop()
+        handler.send_response(200)
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+
+    upstream.routes["/slow"] = (200, {}, slow)
+    pool = bridge.HTTPPool({"discourse": 2})
+    threads = [threading.Thread(target=pool.request, args=("discourse", "POST", f"{upstream.url}/slow"))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(upstream.requests) == 5
+    assert max(peak) == 2
+
+
+def test_a_slow_response_times_out(bridge, upstream, monkeypatch):
+    monkeypatch.setattr(bridge, "HTTP_READ_TIMEOUT", 0.2)
+    upstream.routes["/hang"] = (200, {}, lambda handler: time.sleep(1))
+    pool = bridge.HTTPPool({"api": 1})
+
+    with pytest.raises(TimeoutError):
+        pool.request("api", "GET", f"{upstream.url}/hang")
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import urllib.error
+
+import pytest
+
+
+def test_claim_hands_out_the_oldest_due_email_once(spool):
+    spool.add("e1", "msg_1", "al@example.com", "First")
+    spool.add("e2", "msg_2", "bo@example.com", "Second")
+
+    first = spool.claim()
+    second = spool.claim()
+
+    assert first == (1, "e1", None)
+    assert second == (2, "e2", None)
+    assert spool.claim() is None
+    assert [row[1:3] for row in spool.rows()] == [("working", 1), ("working", 1)]
+
+
+def test_fail_backs_off_exponentially_then_dead_letters(bridge, spool, monkeypatch):
+    monkeypatch.setattr(bridge, "MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(bridge, "RETRY_BASE_SECONDS", 10)
+    monkeypatch.setattr(bridge, "RETRY_MAX_SECONDS", 15)
+    monkeypatch.setattr(bridge.random, "uniform", lambda low, high: 1.0)
+    monkeypatch.setattr(bridge.time, "time", lambda: 1000.0)
+    spool.add("e1", None, "al@example.com", "Hi")
+
+    delays = []
+    for _ in range(3):
+        row_id, _, _ = spool.claim()
+        status, next_attempt_at = spool.fail(row_id, "Discourse is down")
+        delays.append((status, next_attempt_at - 1000.0 if next_attempt_at else 0))
+        # Make the retry due now
+        spool._db.execute("UPDATE emails SET next_attempt_at = 0")
+
+    assert delays == [("pending", 10.0), ("pending", 15.0), ("dead", 0)]
+    assert spool.claim() is None
+    assert spool.rows("dead")[0][8] == "Discourse is down"
+
+
+def test_a_permanent_failure_dead_letters_at_once(spool):
+    spool.add("e1", None, "al@example.com", "Hi")
+    row_id, _, _ = spool.claim()
+
+    assert spool.fail(row_id, "rejected", permanent=True) == ("dead", 0)
+
+
+def test_replay_requeues_dead_emails_with_fresh_attempts(spool):
+    for email_id in ("e1", "e2"):
+        spool.add(email_id, None, "al@example.com", "Hi")
+        row_id, _, _ = spool.claim()
+        spool.fail(row_id, "rejected", permanent=True)
+
+    assert spool.replay([1]) == 1
+    assert [(row[0], row[1], row[2]) for row in spool.rows()] == [(1, "pending", 0), (2, "dead", 1)]
+    assert spool.replay() == 1
+    assert spool.rows("dead") == []
+
+
+def test_recover_requeues_emails_left_working(bridge, spool):
+    spool.add("e1", None, "al@example.com", "Hi")
+    spool.claim()
+
+    # A restart: the new process opens the same database
+    restarted = bridge.Spool(spool.directory)
+    restarted.recover()
+
+    assert restarted.claim() == (1, "e1", None)
+
+
+def test_a_forwarded_email_is_removed_with_its_message(bridge, spool, monkeypatch):
+    def fetch(email_id, path):
+        with open(path, "w") as f:
+            f.write(f"Subject: {email_id}\n\nhello")
+        return True
+
+    forwarded = []
+
+    def forward(path):
+        with open(path) as f:
+            forwarded.append(f.read())
+        return 200
+
+    monkeypatch.setattr(bridge, "fetch_raw_email", fetch)
+    monkeypatch.setattr(bridge, "forward_to_discourse", forward)
+    spool.add("e1", None, "al@example.com", "Hi")
+
+    row_id, email_id, raw_path = spool.claim()
+    spool.finish(row_id, bridge.process_email(row_id, email_id, raw_path))
+
+    assert forwarded == ["Subject: e1\n\nhello"]
+    assert spool.rows() == []
+    assert os.listdir(spool.raw_dir) == []
+
+
+def test_a_retry_reuses_the_downloaded_message(bridge, spool, monkeypatch):
+    fetches = []
+
+    def fetch(email_id, path):
+        fetches.append(email_id)
+        with open(path, "w") as f:
+            f.write("raw")
+        return True
+
+    def forward_fails(path):
+        raise urllib.error.HTTPError("url", 502, "Bad Gateway", {}, None)
+
+    monkeypatch.setattr(bridge, "fetch_raw_email", fetch)
+    monkeypatch.setattr(bridge, "forward_to_discourse", forward_fails)
+    spool.add("e1", None, "al@example.com", "Hi")
+    row_id, email_id, raw_path = spool.claim()
+    with pytest.raises(urllib.error.HTTPError):
+        bridge.process_email(row_id, email_id, raw_path)
+
+    monkeypatch.setattr(bridge, "forward_to_discourse", lambda path: 200)
+    raw_path = spool.rows()[0][9]
+    assert bridge.process_email(row_id, email_id, raw_path) == raw_path
+    assert fetches == ["e1"]
+
+
+@pytest.mark.parametrize("status, permanent", [(422, True), (429, False), (503, False)])
+def test_discourse_client_errors_are_permanent(bridge, spool, monkeypatch, status, permanent):
+    def forward(path):
+        raise urllib.error.HTTPError("url", status, "", {}, None)
+
+    monkeypatch.setattr(bridge, "forward_to_discourse", forward)
+    raw_path = os.path.join(spool.raw_dir, "1.eml")
+    open(raw_path, "w").close()
+
+    with pytest.raises(bridge.PermanentError if permanent else urllib.error.HTTPError):
+        bridge.process_email(1, "e1", raw_path)
+
+
+def test_the_status_column_only_takes_known_states(spool):
+    spool.add("e1", None, "al@example.com", "Hi")
+    with pytest.raises(sqlite3.IntegrityError):
+        spool._db.execute("UPDATE emails SET status = 'done'")
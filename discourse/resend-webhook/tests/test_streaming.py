@@ -0,0 +1,80 @@
+import json
+import os
+import urllib.parse
+
+import pytest
+
+MESSAGE = ("Subject: Shipit\r\n\r\nHéllo & welcome = 100% " * 200).encode()
+
+
+@pytest.fixture
+def resend(bridge, upstream, monkeypatch):
+    """Point the bridge at the fake upstream, with a fresh pool and small chunks."""
+    monkeypatch.setattr(bridge, "RESEND_API_URL", upstream.url)
+    monkeypatch.setattr(bridge, "DISCOURSE_URL", upstream.url)
+    monkeypatch.setattr(bridge, "STREAM_CHUNK_BYTES", 1000)
+    monkeypatch.setattr(bridge, "http_pool", bridge.HTTPPool(bridge.UPSTREAM_CONCURRENCY))
+    download_url = f"{upstream.url}/download/e1?signature=secret"
+    upstream.routes["/emails/receiving/e1"] = (
+        200, {}, json.dumps({"raw": {"download_url": download_url}}).encode())
+    upstream.routes["/download/e1"] = (200, {}, MESSAGE)
+    return upstream
+
+
+def test_encoded_form_chunks_match_urlencode(bridge, tmp_path, monkeypatch):
+    monkeypatch.setattr(bridge, "STREAM_CHUNK_BYTES", 7)
+    path = tmp_path / "raw.eml"
+    path.write_bytes(MESSAGE)
+
+    body = b"".join(bridge.encoded_form_chunks(str(path), "email"))
+
+    assert body == urllib.parse.urlencode({"email": MESSAGE}).encode()
+
+
+def test_fetch_streams_the_message_to_a_file(bridge, resend, tmp_path):
+    path = str(tmp_path / "1.eml")
+
+    assert bridge.fetch_raw_email("e1", path) is True
+
+    with open(path, "rb") as f:
+        assert f.read() == MESSAGE
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_fetch_without_a_download_url_returns_false(bridge, resend, tmp_path):
+    resend.routes["/emails/receiving/e1"] = (200, {}, b'{"raw": {}}')
+
+    assert bridge.fetch_raw_email("e1", str(tmp_path / "1.eml")) is False
+
+
+def test_forward_streams_the_file_with_a_content_length(bridge, resend, tmp_path):
+    resend.routes["/admin/email/handle_mail"] = (200, {}, b"{}")
+    path = tmp_path / "1.eml"
+    path.write_bytes(MESSAGE)
+
+    assert bridge.forward_to_discourse(str(path)) == 200
+
+    (_, method, _, body), = resend.requests
+    assert method == "POST"
+    assert urllib.parse.parse_qs(body.decode(), encoding="utf-8")["email"] == [MESSAGE.decode()]
+
+
+@pytest.mark.parametrize("send_length", [True, False])
+def test_an_oversized_message_is_a_permanent_error(bridge, resend, spool, monkeypatch, send_length):
+    monkeypatch.setattr(bridge, "MAX_EMAIL_BYTES", 4000)
+
+    def oversized(handler):
+        handler.send_response(200)
+        if send_length:
+            handler.send_header("Content-Length", str(len(MESSAGE)))
+        else:
+            handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.wfile.write(MESSAGE)
+        handler.close_connection = True
+
+    resend.routes["/download/e1"] = (200, {}, oversized)
+
+    with pytest.raises(bridge.PermanentError, match="MAX_EMAIL_BYTES"):
+        bridge.process_email(1, "e1", None)
+    assert os.listdir(spool.raw_dir) == []
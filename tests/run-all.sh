@@ -10,21 +10,23 @@ FAIL=0
 
 run_suite() {
   local name="$1"
-  local script="$2"
+  shift
   echo ""
   echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
   echo "  $name"
   echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-  if node "$script"; then
+  if "$@"; then
     PASS=$((PASS + 1))
   else
     FAIL=$((FAIL + 1))
   fi
 }
 
-run_suite "Theme Completeness" "tests/theme-completeness.js"
-run_suite "Studio Logic" "tests/studio-logic.js"
-run_suite "Build Smoke Tests" "tests/build-smoke.js"
+run_suite "Theme Completeness" node tests/theme-completeness.js
+run_suite "Studio Logic" node tests/studio-logic.js
+run_suite "Build Smoke Tests" node tests/build-smoke.js
+run_suite "Project Tracker" python3 -m pytest -q discourse/project-tracker/tests
+run_suite "Resend Webhook Bridge" python3 -m pytest -q discourse/resend-webhook/tests
 
 echo ""
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"